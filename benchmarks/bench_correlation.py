@@ -0,0 +1,76 @@
+"""
+Benchmark: the all-feature correlation matrices (every year plus the whole
+selection) from merged cube moments in one batched NumPy pass vs one
+scipy.stats.pearsonr call per feature pair and year over the rows. Fails if
+the batched pass exceeds the budget or disagrees with pearsonr.
+
+Usage: python benchmarks/bench_correlation.py [--rows 1000000 10000000] [--budget-ms 100]
+"""
+import argparse
+import sys
+from itertools import combinations
+
+import numpy as np
+
+from common import best_time, synthetic_dataset, timed
+
+from spotify_trends.analysis import CORRELATION_FEATURES, feature_correlations
+from spotify_trends.cube import AggregateCube
+from spotify_trends.index import YearGenreIndex, filter_frame
+
+DEFAULT_BUDGET_MS = 100
+
+
+def pairwise_correlations(filtered, features, years):
+    """Per-year and selection correlation matrices with one pearsonr call per pair"""
+    from scipy.stats import pearsonr
+
+    def matrix(values):
+        corr = np.eye(len(features))
+        for i, j in combinations(range(len(features)), 2):
+            corr[i, j] = corr[j, i] = pearsonr(values[:, i], values[:, j])[0]
+        return corr
+
+    values = filtered[features].to_numpy(dtype=np.float64)
+    year = filtered['year'].to_numpy()
+    by_year = np.array([matrix(values[year == y]) for y in years])
+    return by_year, matrix(values)
+
+
+def run(n_rows, budget_ms, repeat):
+    data = synthetic_dataset(n_rows, with_text=False)
+    genres = list(data['genre'].cat.categories[:10])
+    year_range = (2011, 2018)
+    cube, build_ms = timed(lambda: AggregateCube.from_frame(data))
+
+    batched_ms = best_time(lambda: feature_correlations(cube, year_range, genres), repeat)
+    result = feature_correlations(cube, year_range, genres)
+    filtered = filter_frame(data, YearGenreIndex(data), year_range, genres)
+    (by_year, selection), pairwise_ms = timed(
+        lambda: pairwise_correlations(filtered, result['features'], result['years']))
+
+    error = max(np.abs(result['by_year'] - by_year).max(),
+                np.abs(result['selection'] - selection).max())
+    print(f"{n_rows:>11,} rows | {len(result['years'])} years x {len(result['features'])} features | "
+          f"batched {batched_ms:7.2f} ms | pearsonr per pair {pairwise_ms:9.1f} ms | "
+          f"max |diff| {error:.1e} | cube build {build_ms:.0f} ms")
+
+    failed = False
+    if batched_ms > budget_ms:
+        print(f"❌ Batched correlation over budget ({budget_ms:.0f} ms)")
+        failed = True
+    if not error < 1e-9:
+        print("❌ Batched correlation disagrees with pearsonr")
+        failed = True
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(f"Features: {', '.join(CORRELATION_FEATURES)}")
+    failures = [run(n, args.budget_ms, args.repeat) for n in args.rows]
+    sys.exit(1 if any(failures) else 0)
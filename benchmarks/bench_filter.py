@@ -0,0 +1,38 @@
+"""
+Benchmark: year/genre filtering with boolean masks vs the YearGenreIndex
+
+Usage: python benchmarks/bench_filter.py [--rows 10000 1000000 10000000]
+"""
+import argparse
+
+import numpy as np
+
+from common import best_time, synthetic_dataset, timed
+
+from spotify_trends.index import YearGenreIndex, filter_frame, filter_frame_mask
+
+
+def run(n_rows):
+    data = synthetic_dataset(n_rows, with_text=False)
+    genres = list(data['genre'].cat.categories[:3])
+    year_range = (2012, 2017)
+
+    index, build_ms = timed(lambda: YearGenreIndex(data))
+
+    expected = filter_frame_mask(data, year_range, genres)
+    result = filter_frame(data, index, year_range, genres)
+    assert np.array_equal(np.sort(result.index.to_numpy()), expected.index.to_numpy())
+
+    mask_ms = best_time(lambda: filter_frame_mask(data, year_range, genres))
+    index_ms = best_time(lambda: filter_frame(data, index, year_range, genres))
+    positions_ms = best_time(lambda: index.positions(year_range, genres))
+    print(f"{n_rows:>10,} rows | {len(result):>9,} selected | mask {mask_ms:8.2f} ms | "
+          f"index {index_ms:8.2f} ms (positions {positions_ms:6.2f} ms) | build {build_ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+    for n in args.rows:
+        run(n)
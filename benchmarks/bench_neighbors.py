@@ -0,0 +1,64 @@
+"""
+Benchmark: "songs like this" query latency of the KD-tree index vs a
+brute-force scan (distances from the query song to every candidate),
+over the whole catalogue and within a year/genre selection. Fails if the
+two ever return different neighbours.
+
+Usage: python benchmarks/bench_neighbors.py [--rows 100000 1000000] [--k 10]
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from common import best_time, synthetic_dataset, timed
+
+from spotify_trends.index import YearGenreIndex
+from spotify_trends.neighbors import SongIndex, brute_force_neighbors
+
+
+def brute_force(song_index, position, k, allowed):
+    """Neighbours by scanning all allowed rows, the query song excluded"""
+    candidates = np.arange(song_index.n_rows) if allowed is None else allowed
+    return brute_force_neighbors(song_index.values, song_index.values[position], k,
+                                 candidates[candidates != position])
+
+
+def run(n_rows, k, n_queries):
+    data = synthetic_dataset(n_rows, with_text=False)
+    song_index, build_ms = timed(lambda: SongIndex(data))
+    index = YearGenreIndex(data)
+    genres = list(data['genre'].cat.categories)
+    queries = np.random.default_rng(0).choice(n_rows, n_queries, replace=False)
+
+    selections = {
+        'all songs': None,
+        '8 years, 10 genres': index.positions((2011, 2018), genres[:10]),
+        '1 year, 3 genres': index.positions((2015, 2015), genres[:3]),
+    }
+    mismatches = 0
+    print(f"{n_rows:>11,} rows | index build {build_ms:.0f} ms")
+    for name, allowed in selections.items():
+        tree_ms = brute_ms = 0
+        for position in queries:
+            tree_ms += best_time(lambda: song_index.query(position, k, allowed), 3)
+            brute_ms += best_time(lambda: brute_force(song_index, position, k, allowed), 3)
+            tree_result = song_index.query(position, k, allowed)[0]
+            if not np.array_equal(tree_result, brute_force(song_index, position, k, allowed)[0]):
+                mismatches += 1
+        n_allowed = n_rows if allowed is None else len(allowed)
+        print(f"{'':>11} | {name:<20} ({n_allowed:>10,} rows) | "
+              f"tree {tree_ms / n_queries:8.2f} ms | brute force {brute_ms / n_queries:8.2f} ms")
+    if mismatches:
+        print(f"❌ {mismatches} queries returned different neighbours")
+    return mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+    failures = sum(run(n, args.k, args.queries) for n in args.rows)
+    sys.exit(1 if failures else 0)
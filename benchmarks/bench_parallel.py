@@ -0,0 +1,63 @@
+"""
+Benchmark: wall time to compute all page charts one after another vs on
+the chart worker pool (figure cache cold, as after a filter change)
+
+Usage: python benchmarks/bench_parallel.py [--rows 10000 1000000] [--workers 2 4]
+"""
+import argparse
+import os
+
+from common import best_time, synthetic_dataset
+
+from spotify_trends.cube import AggregateCube
+from spotify_trends.figcache import FigureCache
+from spotify_trends.figures import (build_danceability_energy_figure, build_duration_figure,
+                                     build_genre_year_figure, build_popularity_figure,
+                                     build_trend_figure)
+from spotify_trends.index import YearGenreIndex, filter_frame
+from spotify_trends.parallel import iter_chart_specs, make_chart_pool
+
+
+def chart_jobs(data, cube, year_range, genres):
+    """The app's five charts as {chart_id: (key, build)}"""
+    filtered = filter_frame(data, YearGenreIndex(data), year_range, genres)
+    moments = cube.moments(year_range, genres, ['danceability', 'energy'])
+    return {
+        'scatter': (('scatter',), lambda: build_danceability_energy_figure(filtered, moments)),
+        'trend': (('trend',), lambda: build_trend_figure(
+            cube.yearly_mean(['danceability', 'energy'], year_range, genres))),
+        'genre_year': (('genre_year',), lambda: build_genre_year_figure(
+            cube.genre_year_counts(year_range, genres), year_range)),
+        'duration_box': (('duration_box',), lambda: build_duration_figure(filtered)),
+        'popularity_violin': (('popularity_violin',), lambda: build_popularity_figure(filtered)),
+    }
+
+
+def render_all(jobs, pool=None):
+    # A fresh cache per run so every chart is built
+    for _ in iter_chart_specs(jobs, FigureCache(), pool):
+        pass
+
+
+def run(n_rows, workers, repeat):
+    data = synthetic_dataset(n_rows)
+    genres = list(data['genre'].cat.categories[:10])
+    year_range = (2011, 2018)
+    jobs = chart_jobs(data, AggregateCube.from_frame(data), year_range, genres)
+
+    line = f"{n_rows:>10,} rows | sequential {best_time(lambda: render_all(jobs), repeat):8.1f} ms"
+    for n in workers:
+        with make_chart_pool(n) as pool:
+            line += f" | {n} workers {best_time(lambda: render_all(jobs, pool), repeat):8.1f} ms"
+    print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(f"CPUs available: {os.cpu_count()}")
+    for n in args.rows:
+        run(n, args.workers, args.repeat)
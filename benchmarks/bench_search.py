@@ -0,0 +1,68 @@
+"""
+Benchmark: artist/title search through the n-gram inverted index
+(TextSearchIndex + YearGenreIndex.intersect) vs a substring scan of the
+filtered rows (table.search_positions). Fails if the two disagree on any
+query of three or more characters (shorter ones match word prefixes), or if
+a broad query (matching almost every title) takes longer than the budget.
+
+Usage: python benchmarks/bench_search.py [--rows 100000 1000000] [--queries song artist 77 ...]
+                                         [--budget-ms 40]
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from common import best_time, synthetic_dataset, timed
+
+from spotify_trends.index import YearGenreIndex
+from spotify_trends.table import search_positions
+from spotify_trends.textsearch import NGRAM, TextSearchIndex
+
+DEFAULT_QUERIES = ['song 12345', 'artist 77', '999', 'g 1', 'so', 'a']
+# Every synthetic title contains these: the posting lists cover all values
+BROAD_QUERIES = ['song', 'song ', 'son']
+DEFAULT_BUDGET_MS = 40
+
+
+def run(n_rows, queries, repeat, budget_ms):
+    data = synthetic_dataset(n_rows)
+    index = YearGenreIndex(data)
+    search_index, build_ms = timed(lambda: TextSearchIndex(data))
+    selection = (2011, 2018), list(data['genre'].cat.categories[:10])
+    filtered = index.positions(*selection)
+    print(f"{n_rows:>11,} rows | index build {build_ms:.0f} ms | "
+          f"selection {len(filtered):,} rows")
+
+    failures = 0
+    for query in queries + [q for q in BROAD_QUERIES if q not in queries]:
+        def indexed():
+            # Drop the one-query memo so every run searches
+            search_index._last = (None, None)
+            return index.intersect(search_index.search(query), *selection)
+
+        result = indexed()
+        indexed_ms = best_time(indexed, repeat)
+        line = f"{'':>11} | {query!r:<14} {len(result):>9,} matches | index {indexed_ms:8.2f} ms"
+        if len(query) >= NGRAM:
+            scanned, scan_ms = timed(lambda: search_positions(data, filtered, query))
+            line += f" | scan {scan_ms:8.1f} ms"
+            if not np.array_equal(result, scanned):
+                failures += 1
+                line += " ❌ differs"
+        if query in BROAD_QUERIES and indexed_ms > budget_ms:
+            failures += 1
+            line += f" ❌ over the {budget_ms:.0f} ms budget"
+        print(line)
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+    failures = sum(run(n, args.queries, args.repeat, args.budget_ms) for n in args.rows)
+    sys.exit(1 if failures else 0)
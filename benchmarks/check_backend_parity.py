@@ -0,0 +1,96 @@
+"""
+Parity check: the SQLite backend and the pandas path (YearGenreIndex +
+AggregateCube) must give identical filter rows and chart data. Exits with
+status 1 on any mismatch and prints per-query timings of both backends.
+
+Usage: python benchmarks/check_backend_parity.py [--rows 10000 1000000] [--csv top10_s.csv]
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import ROOT, best_time, synthetic_dataset, timed
+
+from spotify_trends.cube import AggregateCube
+from spotify_trends.index import YearGenreIndex
+from spotify_trends.sqlbackend import SqlBackend, build_database
+from spotify_trends.store import load_dataset
+
+FEATURES = ['danceability', 'energy']
+
+
+def selections(data, rng, n=5):
+    """Random year ranges and genre lists, plus the full and an empty selection"""
+    genres = sorted(data['genre'].unique())
+    years = sorted(data['year'].unique())
+    result = [((years[0], years[-1]), genres), ((years[0], years[-1]), [])]
+    for _ in range(n):
+        first, last = sorted(rng.choice(years, 2))
+        picked = list(rng.choice(genres, size=min(len(genres), rng.integers(1, 6)), replace=False))
+        result.append(((int(first), int(last)), picked))
+    return result
+
+
+def compare(name, data):
+    """Compare both backends on one dataset, return the number of mismatches"""
+    index, cube = YearGenreIndex(data), AggregateCube.from_frame(data)
+    with tempfile.TemporaryDirectory() as tmp:
+        _, build_ms = timed(lambda: build_database(data, Path(tmp) / "songs.sqlite"))
+        sql = SqlBackend(Path(tmp) / "songs.sqlite")
+
+        failures = 0
+        checks = {
+            'positions': (lambda s: index.positions(*s), lambda s: sql.positions(*s),
+                          np.testing.assert_array_equal),
+            'count': (lambda s: cube.count(*s), lambda s: sql.count(*s), np.testing.assert_equal),
+            'moments': (lambda s: cube.moments(*s, FEATURES).correlation(),
+                        lambda s: sql.moments(*s, FEATURES).correlation(),
+                        lambda a, b: np.testing.assert_allclose(a, b, rtol=1e-9, equal_nan=True)),
+            'yearly_moments': (lambda s: cube.yearly_moments(*s, FEATURES),
+                               lambda s: sql.yearly_moments(*s, FEATURES),
+                               lambda a, b: [np.testing.assert_allclose(x, y, rtol=1e-9)
+                                             for x, y in zip(a, b)]),
+            'yearly_mean': (lambda s: cube.yearly_mean(FEATURES, *s),
+                            lambda s: sql.yearly_mean(FEATURES, *s),
+                            lambda a, b: pd.testing.assert_frame_equal(a, b, rtol=1e-9)),
+            'genre_year_counts': (lambda s: cube.genre_year_counts(*s),
+                                  lambda s: sql.genre_year_counts(*s), pd.testing.assert_frame_equal),
+            'genre_counts': (lambda s: cube.genre_counts(*s),
+                             lambda s: sql.genre_counts(*s), pd.testing.assert_series_equal),
+        }
+        cases = selections(data, np.random.default_rng(0))
+        for check, (pandas_query, sql_query, assert_equal) in checks.items():
+            for selection in cases:
+                try:
+                    assert_equal(pandas_query(selection), sql_query(selection))
+                except AssertionError as e:
+                    failures += 1
+                    print(f"❌ {name} {check} {selection[0]} {len(selection[1])} genres:\n{e}")
+            pandas_ms = best_time(lambda: pandas_query(cases[2]))
+            sql_ms = best_time(lambda: sql_query(cases[2]))
+            print(f"{name:>12} | {check:<18} pandas {pandas_ms:8.2f} ms | sqlite {sql_ms:8.2f} ms")
+        print(f"{name:>12} | database build {build_ms:.0f} ms | "
+              f"{'OK' if not failures else f'{failures} mismatches'}")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='*', default=[10_000, 1_000_000])
+    parser.add_argument('--csv', default=str(ROOT / 'top10_s.csv'))
+    args = parser.parse_args()
+
+    failures = 0
+    if Path(args.csv).exists():
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = load_dataset(args.csv)
+        failures += compare(Path(args.csv).name, data)
+    for n in args.rows:
+        failures += compare(f"{n:,} rows", synthetic_dataset(n, with_text=False))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,76 @@
+"""
+Cold-start import budget: imports the modules streamlit_app.py loads at
+startup under `python -X importtime` in a fresh interpreter, fails if the
+total exceeds the budget or if a module that should be deferred until a
+chart is drawn (plotly.express, scipy, PIL) is imported eagerly.
+
+Usage: python benchmarks/check_import_time.py [--budget-ms 800] [--runs 3]
+The default budget can be set with SPOTIFY_IMPORT_BUDGET_MS (e.g. on slow CI machines).
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+from common import ROOT
+
+# Modules imported at the top of streamlit_app.py
+APP_MODULES = ['analysis', 'assets', 'cube', 'export', 'figcache', 'figures', 'index',
+               'neighbors', 'parallel', 'profiling', 'reload', 'shared', 'snapshot', 'sqlbackend',
+               'store', 'streaming', 'style', 'synthetic', 'table', 'textsearch']
+
+# Must only be imported when a chart or image is actually built
+DEFERRED_MODULES = ['plotly.express', 'plotly.graph_objects', 'scipy', 'PIL']
+
+DEFAULT_BUDGET_MS = float(os.environ.get("SPOTIFY_IMPORT_BUDGET_MS", 800))
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure():
+    """(total ms, {module: cumulative ms}) of one cold import of the app modules"""
+    code = "; ".join(f"import spotify_trends.{m}" for m in APP_MODULES)
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    cumulative = {}
+    total_us = 0
+    for match in _LINE.finditer(stderr):
+        _, cum_us, indent, name = match.groups()
+        cumulative[name] = int(cum_us) / 1000
+        if len(indent) == 1:
+            # Top-level import (one space after the bar)
+            total_us += int(cum_us)
+    return total_us / 1000, cumulative
+
+
+def best_of(runs):
+    """(total ms, {module: cumulative ms}) of the fastest of several cold imports"""
+    return min((measure() for _ in range(runs)), key=lambda run: run[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    # Best of several runs: the first one also warms the OS file cache
+    total_ms, cumulative = best_of(args.runs)
+
+    heaviest = sorted(((ms, name) for name, ms in cumulative.items() if '.' not in name),
+                      reverse=True)[:8]
+    print(f"Cold import of app modules: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for ms, name in heaviest:
+        print(f"    {name:<28}{ms:>8.1f} ms")
+
+    eager = [m for m in DEFERRED_MODULES if m in cumulative]
+    if eager:
+        print(f"❌ Imported at startup but should be deferred: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        print(f"❌ Import time over budget by {total_ms - args.budget_ms:.0f} ms")
+    sys.exit(1 if eager or total_ms > args.budget_ms else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from spotify_trends.schema import apply_schema  # noqa: E402
+from spotify_trends.synthetic import make_spotify_frame  # noqa: E402
+
+
+def best_time(func, repeat=5):
+    """Best wall time of several runs, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def timed(func):
+    """Run func once, return (result, wall time in milliseconds)"""
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def synthetic_dataset(n_rows, with_text=True, seed=42):
+    """Synthetic dataset with the app's compact dtypes"""
+    return apply_schema(make_spotify_frame(n_rows, seed=seed, with_text=with_text))
@@ -0,0 +1,103 @@
+"""
+Load test: resident memory with N concurrent sessions when every session
+gets its own copy of the dataset (st.cache_data unpickles one per call)
+vs one frozen shared frame with per-session views and row positions
+('shared', what the app keeps between reruns), and the same plus the
+gathered rows of each selection ('gathered', what a session holds while
+its rerun runs, or kept if the rows outlived the run). 'sqlite' is 'shared'
+with the filter positions read from the SQLite backend (SPOTIFY_BACKEND=sqlite),
+which still needs the frame for the song-level views.
+Each strategy runs in a fresh subprocess so their RSS does not mix.
+
+Usage: python benchmarks/load_test_sessions.py [--rows 500000] [--sessions 1 5 10 25]
+"""
+import argparse
+import gc
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from common import synthetic_dataset
+
+from spotify_trends.index import YearGenreIndex
+from spotify_trends.shared import freeze_frame, session_view
+from spotify_trends.sqlbackend import SqlBackend
+
+STRATEGIES = ['copy', 'shared', 'gathered', 'sqlite']
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux /proc; peak RSS elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def simulate(strategy, n_rows, session_counts):
+    """RSS after opening 0..max(session_counts) sessions with one strategy"""
+    data = synthetic_dataset(n_rows)
+    index = YearGenreIndex(data)
+    genres = list(data['genre'].cat.categories)
+    rng = np.random.default_rng(0)
+
+    if strategy == 'copy':
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        del data
+    else:
+        data = freeze_frame(data)
+    if strategy == 'sqlite':
+        db_dir = tempfile.TemporaryDirectory()
+        index = SqlBackend.from_frame(data, Path(db_dir.name) / "songs.sqlite", version="load-test")
+    gc.collect()
+
+    sessions = []
+    result = {'baseline': rss_mb()}
+    for n in range(1, max(session_counts) + 1):
+        frame = pickle.loads(payload) if strategy == 'copy' else session_view(data)
+        selection = (2011 + int(rng.integers(0, 4)), 2019), list(rng.choice(genres, 5, replace=False))
+        positions = index.positions(*selection)
+        if strategy == 'gathered':
+            sessions.append((frame, positions, frame.take(positions)))
+        else:
+            sessions.append((frame, positions))
+        if n in session_counts:
+            gc.collect()
+            result[n] = rss_mb()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 25])
+    parser.add_argument('--strategy', choices=STRATEGIES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.strategy:
+        print(json.dumps(simulate(args.strategy, args.rows, args.sessions)))
+        return
+
+    results = {}
+    for strategy in STRATEGIES:
+        out = subprocess.run([sys.executable, __file__, '--strategy', strategy,
+                              '--rows', str(args.rows), '--sessions', *map(str, args.sessions)],
+                             capture_output=True, text=True, check=True).stdout
+        results[strategy] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{args.rows:,} rows | RSS in MB (baseline = dataset loaded, no sessions)")
+    print(f"{'sessions':>10}" + "".join(f"{s:>12}" for s in STRATEGIES))
+    for key in ['baseline'] + [str(n) for n in args.sessions]:
+        print(f"{key:>10}" + "".join(f"{results[s][key]:>12.0f}" for s in STRATEGIES))
+
+
+if __name__ == '__main__':
+    main()
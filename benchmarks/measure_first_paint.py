@@ -0,0 +1,95 @@
+"""
+Time to first chart: starts `streamlit run streamlit_app.py` headless, opens
+sessions over the app's websocket like a browser and measures, from the rerun
+request, when the first chart and the end of the script reach the client.
+The first session hits a cold server process, the next ones a warm one.
+Runs with the default-view snapshot off (live) and on (python -m spotify_trends.snapshot).
+
+Usage: python benchmarks/measure_first_paint.py [--sessions 3] [--port 8599] [--mode live snapshot]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from common import ROOT
+
+MODES = ['live', 'snapshot']
+
+
+async def open_session(url):
+    """(ms to the first chart, ms to the end of the script) of one new session"""
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        request = BackMsg()
+        request.rerun_script.query_string = ""
+        request.rerun_script.page_script_hash = ""
+        start = time.perf_counter()
+        await ws.send(request.SerializeToString())
+        first_chart = None
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await ws.recv())
+            kind = msg.WhichOneof('type')
+            if (first_chart is None and kind == 'delta'
+                    and msg.delta.WhichOneof('type') == 'new_element'
+                    and msg.delta.new_element.WhichOneof('type') == 'plotly_chart'):
+                first_chart = (time.perf_counter() - start) * 1000
+            if kind == 'script_finished':
+                return first_chart, (time.perf_counter() - start) * 1000
+
+
+def wait_until_healthy(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"streamlit did not start on port {port}")
+
+
+def measure(mode, port, n_sessions):
+    """[(first chart ms, script ms)] of n sessions opened one after another on a fresh server"""
+    env = dict(os.environ, SPOTIFY_SNAPSHOT="1" if mode == 'snapshot' else "0")
+    if mode == 'snapshot':
+        subprocess.run([sys.executable, '-m', 'spotify_trends.snapshot'], cwd=ROOT, env=env,
+                       check=True)
+    server = subprocess.Popen([sys.executable, '-m', 'streamlit', 'run', 'streamlit_app.py',
+                               '--server.headless', 'true', '--server.port', str(port),
+                               '--browser.gatherUsageStats', 'false'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    try:
+        wait_until_healthy(port)
+        url = f"ws://localhost:{port}/_stcore/stream"
+        return [asyncio.run(open_session(url)) for _ in range(n_sessions)]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8599)
+    parser.add_argument('--mode', choices=MODES, nargs='+', default=MODES)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'session':>10}{'first chart':>14}{'script done':>14}")
+    for mode in args.mode:
+        for i, (first_chart, done) in enumerate(measure(mode, args.port, args.sessions)):
+            label = 'cold' if i == 0 else f'warm {i}'
+            first = f"{first_chart:.0f} ms" if first_chart is not None else "none"
+            print(f"{mode:<10}{label:>10}{first:>14}{done:>11.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
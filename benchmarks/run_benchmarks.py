@@ -0,0 +1,172 @@
+"""
+Headless benchmark suite: times load, filter, aggregate, statistics and
+figure build on synthetic datasets, writes the results to
+benchmarks/results/<timestamp>.json and compares them with the previous run.
+
+Usage: python benchmarks/run_benchmarks.py [--rows 600 10000 ...] [--fail-on-regression]
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import ROOT, best_time, synthetic_dataset, timed
+
+from spotify_trends.analysis import correlation_summary, data_overview
+from spotify_trends.cube import AggregateCube
+from spotify_trends.figures import (build_danceability_energy_figure, build_duration_figure,
+                                     build_genre_year_figure, build_popularity_figure,
+                                     build_trend_figure)
+from spotify_trends.index import YearGenreIndex, filter_frame
+from spotify_trends.store import convert_csv, read_store
+from spotify_trends.synthetic import make_spotify_frame
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_ROWS = [600, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# Loading writes the synthetic CSV first, which gets slow for huge sizes
+DEFAULT_MAX_LOAD_ROWS = 1_000_000
+
+
+def bench_load(n_rows, repeat):
+    """CSV -> columnar store conversion and memory-mapped load"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "songs.csv"
+        store_path = Path(tmp) / "songs.feather"
+        make_spotify_frame(n_rows).to_csv(csv_path, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, results['load.convert_csv'] = timed(lambda: convert_csv(csv_path, store_path))
+        results['load.read_store'] = best_time(lambda: read_store(store_path), repeat)
+    return results
+
+
+def bench_pipeline(data, repeat):
+    """Filter, aggregate, statistics and figure build for one dataset"""
+    genres = list(data['genre'].cat.categories[:3])
+    year_range = (int(data['year'].min()) + 2, int(data['year'].max()) - 2)
+    results = {}
+
+    index, results['filter.build_index'] = timed(lambda: YearGenreIndex(data))
+    results['filter.select'] = best_time(
+        lambda: filter_frame(data, index, year_range, genres), repeat)
+    filtered = filter_frame(data, index, year_range, genres)
+    results['filter.overview'] = best_time(
+        lambda: data_overview(filtered, year_range, genres), repeat)
+
+    cube, results['aggregate.build_cube'] = timed(lambda: AggregateCube.from_frame(data))
+    results['aggregate.yearly_mean'] = best_time(
+        lambda: cube.yearly_mean(['danceability', 'energy'], year_range, genres), repeat)
+    results['aggregate.genre_year_counts'] = best_time(
+        lambda: cube.genre_year_counts(year_range, genres), repeat)
+    results['aggregate.genre_counts'] = best_time(
+        lambda: cube.genre_counts(year_range, genres), repeat)
+
+    moments = cube.moments(year_range, genres, ['danceability', 'energy'])
+    results['statistics.correlation'] = best_time(
+        lambda: correlation_summary(cube.moments(year_range, genres, ['danceability', 'energy'])),
+        repeat)
+
+    results['figure.scatter'] = best_time(
+        lambda: build_danceability_energy_figure(filtered, moments).to_json(), repeat)
+    results['figure.trend'] = best_time(
+        lambda: build_trend_figure(
+            cube.yearly_mean(['danceability', 'energy'], year_range, genres)).to_json(), repeat)
+    results['figure.genre_year'] = best_time(
+        lambda: build_genre_year_figure(cube.genre_year_counts(year_range, genres),
+                                        year_range).to_json(), repeat)
+    results['figure.duration_box'] = best_time(
+        lambda: build_duration_figure(filtered).to_json(), repeat)
+    results['figure.popularity_violin'] = best_time(
+        lambda: build_popularity_figure(filtered).to_json(), repeat)
+    return results
+
+
+def environment():
+    """Versions and revision the results were recorded with"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def previous_results(exclude=None):
+    """Most recent earlier results file, or None"""
+    files = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return json.loads(files[-1].read_text()) if files else None
+
+
+def compare(current, previous, threshold):
+    """Print per-benchmark change vs the previous run, return regressions"""
+    regressions = []
+    for rows, timings in current['results'].items():
+        old = previous['results'].get(rows, {})
+        for name, ms in timings.items():
+            if name not in old or old[name] <= 0:
+                continue
+            change = ms / old[name] - 1
+            flag = ''
+            # Ignore sub-millisecond noise
+            if change > threshold and ms - old[name] > 1:
+                regressions.append((rows, name, change))
+                flag = '  <-- regression'
+            print(f"{int(rows):>10,}  {name:<28}{old[name]:>10.2f} -> {ms:>10.2f} ms"
+                  f"  ({change:+.0%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--max-load-rows', type=int, default=DEFAULT_MAX_LOAD_ROWS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    run = {'timestamp': datetime.now(timezone.utc).isoformat(), 'environment': environment(),
+           'results': {}}
+    for n_rows in args.rows:
+        timings = {}
+        if n_rows <= args.max_load_rows:
+            timings.update(bench_load(n_rows, args.repeat))
+        timings.update(bench_pipeline(synthetic_dataset(n_rows), args.repeat))
+        run['results'][str(n_rows)] = timings
+        print(f"{n_rows:>10,} rows")
+        for name, ms in timings.items():
+            print(f"            {name:<28}{ms:>10.2f} ms")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = RESULTS_DIR / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    previous = previous_results(exclude=out_path)
+    out_path.write_text(json.dumps(run, indent=2))
+    print(f"Results written to {out_path}")
+
+    if previous:
+        print(f"Compared with run of {previous['timestamp']} "
+              f"({previous['environment'].get('commit')}):")
+        regressions = compare(run, previous, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
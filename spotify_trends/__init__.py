@@ -0,0 +1,3 @@
+"""
+Helpers for the Spotify Music Trends Analysis app
+"""
@@ -0,0 +1,77 @@
+"""
+Analytics for the dashboard panels (pure functions; no Streamlit)
+"""
+import numpy as np
+
+from spotify_trends.stats import correlation_matrices
+
+# Audio features compared in the correlation heatmap
+CORRELATION_FEATURES = ['danceability', 'energy', 'valence', 'acousticness', 'speechiness',
+                        'liveness', 'loudness', 'bpm']
+
+
+def data_overview(filtered, year_range, genres, total=None):
+    """Sidebar metrics for the current selection (total: row count if filtered is a sample)"""
+    n_cells = filtered.shape[0] * filtered.shape[1]
+    completeness = (1 - filtered.isnull().sum().sum() / n_cells) * 100 if n_cells else np.nan
+    return {
+        'total_songs': len(filtered) if total is None else total,
+        'year_span': year_range[1] - year_range[0] + 1,
+        'genre_count': len(genres),
+        'completeness': completeness,
+    }
+
+
+def correlation_summary(moments, x='danceability', y='energy'):
+    """Pearson correlation, p-value and trend line of two columns"""
+    corr, p_value = moments.pearson(x, y)
+    slope, intercept = moments.linear_fit(x, y)
+    return {
+        'corr': corr,
+        'p_value': p_value,
+        'significant': bool(p_value < 0.05),
+        'slope': slope,
+        'intercept': intercept,
+    }
+
+
+def feature_correlations(backend, year_range, genres, features=CORRELATION_FEATURES):
+    """
+    Correlation matrix of the audio features for every year and for the whole
+    selection, from merged per-(year, genre) moments in one batched pass
+    """
+    features = [f for f in features if f in backend.features]
+    years, counts, sums, cross = backend.yearly_moments(year_range, genres, features)
+    # The selection's moments are the sum over its years: one more matrix in the batch
+    corr = correlation_matrices(np.append(counts, counts.sum()),
+                                np.vstack([sums, sums.sum(axis=0)]),
+                                np.concatenate([cross, cross.sum(axis=0)[None]]))
+    return {
+        'features': features,
+        'years': years,
+        'counts': counts,
+        'by_year': corr[:-1],
+        'selection': corr[-1],
+    }
+
+
+def correlation_drift(correlations):
+    """Feature pair whose correlation changed most between the first and last year"""
+    by_year = correlations['by_year']
+    if len(by_year) < 2:
+        return None
+    rows, cols = np.triu_indices(len(correlations['features']), k=1)
+    change = by_year[-1][rows, cols] - by_year[0][rows, cols]
+    if np.isnan(change).all():
+        return None
+    best = np.nanargmax(np.abs(change))
+    i, j = rows[best], cols[best]
+    features = correlations['features']
+    return {
+        'pair': (features[i], features[j]),
+        'first': by_year[0][i, j],
+        'last': by_year[-1][i, j],
+        'change': change[best],
+        'first_year': int(correlations['years'][0]),
+        'last_year': int(correlations['years'][-1]),
+    }
@@ -0,0 +1,241 @@
+"""
+Processed image assets (background image) with a persistent cache
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+
+# Default location of the on-disk asset cache (next to the app)
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "assets"
+
+# Streamlit static-file folder (served at app/static/ when
+# server.enableStaticServing is on)
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_URL_PREFIX = "app/static"
+
+# Image format -> (file extension, MIME type)
+IMAGE_FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'WEBP': ('webp', 'image/webp'),
+}
+
+
+def mime_type(fmt):
+    """Return the MIME type for an image format name"""
+    return IMAGE_FORMATS.get(fmt.upper(), ('bin', 'application/octet-stream'))[1]
+
+
+def data_uri_size(n_bytes, fmt):
+    """Size in bytes of the base64 data URI for an image of n_bytes"""
+    return len(f"data:{mime_type(fmt)};base64,") + 4 * ((n_bytes + 2) // 3)
+
+
+def encode_image(image_path, max_width=1920, fmt='JPEG', quality=85):
+    """Open, resize (max width) and re-encode an image, return the bytes"""
+    from PIL import Image
+
+    img = Image.open(image_path)
+
+    # Convert RGBA/palette images to RGB for JPEG
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    # Resize if too large
+    if img.width > max_width:
+        ratio = max_width / img.width
+        new_size = (max_width, int(img.height * ratio))
+        img = img.resize(new_size, Image.LANCZOS)
+        print(f"🔧 Resized image to {new_size}")
+
+    # Save to bytes with compression
+    img_byte_arr = io.BytesIO()
+    img.save(img_byte_arr, format=fmt.upper(), quality=quality, optimize=True)
+    return img_byte_arr.getvalue()
+
+
+class AssetCache:
+    """
+    Two-level (memory + disk) cache for processed image bytes.
+    Entries are keyed by file path, mtime and target width/format, so a
+    modified source image is re-encoded automatically.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._memory = {}
+        self._encoded = {}
+        self._urls = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, image_path, max_width, fmt, quality):
+        """Build the cache key for an image, raises FileNotFoundError"""
+        path = Path(image_path).resolve()
+        mtime = os.stat(path).st_mtime_ns
+        return str(path), mtime, max_width, fmt.upper(), quality
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+        ext = IMAGE_FORMATS.get(key[3], ('bin',))[0]
+        return self.cache_dir / f"{Path(key[0]).stem}-{digest}.{ext}"
+
+    def get(self, image_path, max_width=1920, fmt='JPEG', quality=85):
+        """Return the processed image bytes, encoding them only on a miss"""
+        key = self.key(image_path, max_width, fmt, quality)
+
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+
+        disk_path = self._disk_path(key)
+        try:
+            data = disk_path.read_bytes()
+            with self._lock:
+                self.disk_hits += 1
+        except OSError:
+            data = encode_image(image_path, max_width, fmt, quality)
+            with self._lock:
+                self.misses += 1
+            try:
+                disk_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = disk_path.with_suffix(disk_path.suffix + '.tmp')
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, disk_path)
+            except OSError as e:
+                print(f"⚠️ Could not write asset cache: {e}")
+
+        with self._lock:
+            self._memory[key] = data
+        return data
+
+    def get_base64(self, image_path, max_width=1920, fmt='JPEG', quality=85):
+        """Return the processed image as a base64 string"""
+        data = self.get(image_path, max_width, fmt, quality)
+        key = self.key(image_path, max_width, fmt, quality)
+        with self._lock:
+            encoded = self._encoded.get(key)
+            if encoded is None:
+                encoded = base64.b64encode(data).decode()
+                self._encoded[key] = encoded
+        return encoded
+
+    def static_url(self, image_path, max_width=1920, fmt='JPEG', quality=85,
+                   static_dir=STATIC_DIR):
+        """
+        Publish the processed image to the static folder and return its URL.
+        The file name carries a content hash so browsers can cache it forever.
+        """
+        key = self.key(image_path, max_width, fmt, quality)
+        with self._lock:
+            url = self._urls.get(key)
+        if url is not None:
+            return url
+
+        data = self.get(image_path, max_width, fmt, quality)
+        stem = Path(image_path).stem
+        ext = IMAGE_FORMATS.get(fmt.upper(), ('bin',))[0]
+        content_hash = hashlib.sha256(data).hexdigest()[:12]
+        file_name = f"{stem}-{content_hash}.{ext}"
+
+        static_dir = Path(static_dir)
+        target = static_dir / file_name
+        if not target.exists():
+            static_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_suffix(target.suffix + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, target)
+            # Remove stale versions of the same image
+            for old in static_dir.glob(f"{stem}-*.{ext}"):
+                if old.name != file_name:
+                    old.unlink(missing_ok=True)
+            print(f"📦 Published {file_name} ({len(data) / 1024:.1f} KB)")
+
+        url = f"{STATIC_URL_PREFIX}/{file_name}"
+        with self._lock:
+            self._urls[key] = url
+        return url
+
+    def stats(self):
+        """Return hit/miss counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._memory),
+            }
+
+    def clear(self):
+        """Drop the in-memory entries (the disk cache is kept)"""
+        with self._lock:
+            self._memory.clear()
+            self._encoded.clear()
+            self._urls.clear()
+
+
+# Process-wide cache shared by all sessions
+asset_cache = AssetCache()
+
+
+# Function to convert local image to base64 with compression
+def get_base64_image(image_path, max_width=1920, fmt='JPEG'):
+    """Convert local image to base64 string for CSS usage (cached across reruns)"""
+    try:
+        encoded = asset_cache.get_base64(image_path, max_width=max_width, fmt=fmt)
+        return encoded
+    except ImportError:
+        print("⚠️ PIL not found, trying without compression...")
+        try:
+            with open(image_path, "rb") as img_file:
+                encoded = base64.b64encode(img_file.read()).decode()
+                return encoded
+        except Exception as e:
+            print(f"❌ Error loading image: {e}")
+            return None
+    except FileNotFoundError:
+        print(f"❌ Background image not found: {image_path}")
+        return None
+    except Exception as e:
+        print(f"❌ Error loading image: {e}")
+        return None
+
+
+# Function to get the CSS url() of the background image
+def get_background_url(image_path, mode='static', static_enabled=True, max_width=1920,
+                       fmt='JPEG'):
+    """Return a static URL (if enabled) or a base64 data URI for the background"""
+    if mode == "static" and static_enabled:
+        try:
+            return asset_cache.static_url(image_path, max_width=max_width, fmt=fmt)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Static background failed, falling back to inline: {e}")
+
+    encoded = get_base64_image(image_path, max_width=max_width, fmt=fmt)
+    if encoded:
+        return f"data:{mime_type(fmt)};base64,{encoded}"
+    return None
+
+
+def style_payload_sizes(page_css, bg_url, image_path, max_width=1920, fmt='JPEG'):
+    """
+    Bytes of the style block sent per rerun, and what it would be with the
+    image inlined: returns (inline_bytes, sent_bytes)
+    """
+    sent_bytes = len(page_css.encode("utf-8"))
+    inline_bytes = sent_bytes
+    if bg_url and not bg_url.startswith("data:"):
+        try:
+            image_bytes = asset_cache.get(image_path, max_width=max_width, fmt=fmt)
+            inline_bytes = sent_bytes - len(bg_url) + data_uri_size(len(image_bytes), fmt)
+        except Exception:
+            pass
+    return inline_bytes, sent_bytes
@@ -0,0 +1,178 @@
+"""
+Materialized aggregate cube: counts, sums and cross products (sums of
+squares on the diagonal) of the audio features per (year, genre) cell.
+Chart data and statistics for any year-range/genre selection are answered
+by summing cells instead of scanning rows, and new rows (e.g. a new year)
+can be appended without a rebuild.
+"""
+import numpy as np
+import pandas as pd
+
+from spotify_trends.schema import AUDIO_FEATURES
+from spotify_trends.stats import Moments
+
+
+class AggregateCube:
+    """Per (year, genre) count, sum and cross products of feature columns"""
+
+    def __init__(self, features=AUDIO_FEATURES, version=None):
+        self.features = list(features)
+        self.version = version
+        self.years = np.empty(0, dtype=np.int64)
+        self.genres = []
+        self._genre_lookup = {}
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.sums = np.zeros((0, 0, len(self.features)))
+        self.cross = np.zeros((0, 0, len(self.features), len(self.features)))
+
+    @classmethod
+    def from_frame(cls, data, features=AUDIO_FEATURES, version=None):
+        """Build a cube from a DataFrame (features missing from it are skipped)"""
+        cube = cls([f for f in features if f in data.columns], version=version)
+        cube.append(data)
+        return cube
+
+    @classmethod
+    def from_positions(cls, data, positions, features=AUDIO_FEATURES, version=None):
+        """Build a cube from some rows of a DataFrame, gathering only the columns it needs"""
+        features = [f for f in features if f in data.columns]
+        return cls.from_frame(data[['year', 'genre'] + features].take(positions), features,
+                              version=version)
+
+    def _grow(self, years, genres):
+        """Extend the cell arrays with unseen years and genres"""
+        new_years = np.setdiff1d(years, self.years)
+        new_genres = [g for g in genres if g not in self._genre_lookup]
+        if len(new_years) == 0 and not new_genres:
+            return
+
+        all_years = np.union1d(self.years, new_years)
+        year_pos = np.searchsorted(all_years, self.years)
+        shape = (len(all_years), len(self.genres) + len(new_genres))
+
+        counts = np.zeros(shape, dtype=np.int64)
+        sums = np.zeros(shape + (len(self.features),))
+        cross = np.zeros(shape + (len(self.features), len(self.features)))
+        n_old = len(self.genres)
+        counts[year_pos, :n_old] = self.counts
+        sums[year_pos, :n_old] = self.sums
+        cross[year_pos, :n_old] = self.cross
+
+        self.years = all_years
+        for genre in new_genres:
+            self._genre_lookup[genre] = len(self.genres)
+            self.genres.append(genre)
+        self.counts, self.sums, self.cross = counts, sums, cross
+
+    def append(self, data):
+        """Add the rows of a DataFrame to the cube"""
+        if len(data) == 0:
+            return self
+        year = data['year'].to_numpy()
+        genre_codes, genre_values = pd.factorize(data['genre'])
+        self._grow(np.unique(year), list(genre_values))
+
+        genre_ids = np.array([self._genre_lookup[g] for g in genre_values], dtype=np.int64)
+        n_cells = self.counts.size
+        cells = (np.searchsorted(self.years, year) * len(self.genres)
+                 + genre_ids[genre_codes])
+
+        shape = self.counts.shape
+        self.counts += np.bincount(cells, minlength=n_cells).reshape(shape)
+        values = [data[f].to_numpy(dtype=np.float64) for f in self.features]
+        for i, x in enumerate(values):
+            self.sums[:, :, i] += np.bincount(cells, weights=x, minlength=n_cells).reshape(shape)
+            for j in range(i, len(values)):
+                xy = np.bincount(cells, weights=x * values[j], minlength=n_cells).reshape(shape)
+                self.cross[:, :, i, j] += xy
+                if i != j:
+                    self.cross[:, :, j, i] += xy
+        return self
+
+    @property
+    def sumsq(self):
+        """Per-cell sums of squares (diagonal of the cross products)"""
+        return np.diagonal(self.cross, axis1=2, axis2=3)
+
+    def _selection(self, year_range, genres):
+        """Year mask and genre positions for a selection"""
+        year_mask = (self.years >= year_range[0]) & (self.years <= year_range[1])
+        genre_ids = [self._genre_lookup[g] for g in genres if g in self._genre_lookup]
+        return year_mask, np.array(genre_ids, dtype=np.int64)
+
+    def count(self, year_range, genres):
+        """Number of rows in the selection"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        return int(self.counts[year_mask][:, genre_ids].sum())
+
+    def moments(self, year_range, genres, features=None):
+        """Merged Moments of the selected cells (optionally a feature subset)"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        feature_ids = [self.features.index(f) for f in (features or self.features)]
+        cells = np.ix_(year_mask.nonzero()[0], genre_ids)
+        cross = self.cross[cells].sum(axis=(0, 1))
+        return Moments([self.features[i] for i in feature_ids],
+                       n=int(self.counts[cells].sum()),
+                       sums=self.sums[cells].sum(axis=(0, 1))[feature_ids],
+                       cross=cross[np.ix_(feature_ids, feature_ids)])
+
+    def yearly_moments(self, year_range, genres, features=None):
+        """Per-year (years, counts, sums, cross products) of the selection, years with rows"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        feature_ids = [self.features.index(f) for f in (features or self.features)]
+        cells = np.ix_(year_mask.nonzero()[0], genre_ids)
+        counts = self.counts[cells].sum(axis=1)
+        sums = self.sums[cells].sum(axis=1)[:, feature_ids]
+        cross = self.cross[cells].sum(axis=1)[:, feature_ids][:, :, feature_ids]
+
+        present = counts > 0
+        return self.years[year_mask][present], counts[present], sums[present], cross[present]
+
+    def yearly_mean(self, features, year_range, genres):
+        """Per-year mean of features (like groupby('year')[features].mean())"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        counts = self.counts[year_mask][:, genre_ids].sum(axis=1)
+        feature_ids = [self.features.index(f) for f in features]
+        sums = self.sums[year_mask][:, genre_ids][:, :, feature_ids].sum(axis=1)
+
+        present = counts > 0
+        result = pd.DataFrame(sums[present] / counts[present, None], columns=list(features))
+        result.insert(0, 'year', self.years[year_mask][present])
+        return result
+
+    def yearly_std(self, features, year_range, genres):
+        """Per-year sample standard deviation of features (years with 2+ rows)"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        counts = self.counts[year_mask][:, genre_ids].sum(axis=1)
+        feature_ids = [self.features.index(f) for f in features]
+        sums = self.sums[year_mask][:, genre_ids][:, :, feature_ids].sum(axis=1)
+        sumsq = self.sumsq[year_mask][:, genre_ids][:, :, feature_ids].sum(axis=1)
+
+        present = counts > 1
+        n = counts[present, None]
+        variance = (sumsq[present] - sums[present] ** 2 / n) / (n - 1)
+        result = pd.DataFrame(np.sqrt(np.maximum(variance, 0)), columns=list(features))
+        result.insert(0, 'year', self.years[year_mask][present])
+        return result
+
+    def genre_year_counts(self, year_range, genres):
+        """Song count per (year, genre) (like groupby(['year', 'genre']).size())"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        genre_ids = np.array(sorted(genre_ids, key=lambda i: self.genres[i]), dtype=np.int64)
+        counts = self.counts[year_mask][:, genre_ids]
+
+        year_idx, genre_idx = np.nonzero(counts)
+        return pd.DataFrame({
+            'year': self.years[year_mask][year_idx],
+            'genre': np.array(self.genres, dtype=object)[genre_ids[genre_idx]],
+            'count': counts[year_idx, genre_idx],
+        })
+
+    def genre_counts(self, year_range, genres):
+        """Song count per genre, descending (like value_counts())"""
+        year_mask, genre_ids = self._selection(year_range, genres)
+        genre_ids = np.array(sorted(genre_ids, key=lambda i: self.genres[i]), dtype=np.int64)
+        counts = pd.Series(self.counts[year_mask][:, genre_ids].sum(axis=0),
+                           index=pd.Index([self.genres[i] for i in genre_ids], name='genre'),
+                           name='count')
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
@@ -0,0 +1,143 @@
+"""
+On-demand exports of the filtered data. Files are written in row chunks to
+a disk cache keyed by filter state and format, and only when a download is
+requested, so reruns never serialize the selection.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+EXPORT_DIR = Path(__file__).resolve().parent.parent / ".cache" / "exports"
+EXPORT_CHUNK_ROWS = 100_000
+EXPORT_MAX_FILES = 32
+
+# label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    """Export formats usable in this environment (Parquet needs pyarrow)"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return [label for label in EXPORT_FORMATS if label != "Parquet"]
+    return list(EXPORT_FORMATS)
+
+
+def _row_chunks(data, chunk_rows):
+    for start in range(0, len(data), chunk_rows):
+        yield data.iloc[start:start + chunk_rows]
+
+
+def write_csv(data, f, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write a DataFrame as CSV text to an open binary file, chunk by chunk"""
+    f.write(data.iloc[:0].to_csv(index=False).encode('utf-8'))
+    for chunk in _row_chunks(data, chunk_rows):
+        f.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+
+def write_parquet(data, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write a DataFrame as Parquet, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(data, preserve_index=False)
+    with pq.ParquetWriter(str(path), schema, compression='snappy') as writer:
+        for chunk in _row_chunks(data, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        if len(data) == 0:
+            writer.write_table(schema.empty_table())
+
+
+def write_export(data, path, label, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write data to path in the given export format"""
+    if label == "CSV":
+        with open(path, "wb") as f:
+            write_csv(data, f, chunk_rows)
+    elif label == "CSV (gzip)":
+        with gzip.open(path, "wb", compresslevel=1) as f:
+            write_csv(data, f, chunk_rows)
+    elif label == "Parquet":
+        write_parquet(data, path, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {label}")
+
+
+class ExportCache:
+    """Disk cache of export files keyed by filter state and format"""
+
+    def __init__(self, cache_dir=EXPORT_DIR, max_files=EXPORT_MAX_FILES):
+        self.cache_dir = Path(cache_dir)
+        self.max_files = max_files
+        # Guards the counters, the existence check and eviction; each file is
+        # written under its own lock so one large export does not block the others
+        self._lock = threading.Lock()
+        self._path_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key, label):
+        """Cache file for a filter-state key and format"""
+        digest = hashlib.sha1(repr((key, label)).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"export-{digest}.{EXPORT_FORMATS[label][0]}"
+
+    def get_path(self, key, label, data):
+        """Return the export file for key, writing it from data on a miss"""
+        path = self.path_for(key, label)
+        if self._cached(path):
+            return path
+        with self._lock:
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+
+        with path_lock:
+            # Another session may have written it while this one waited
+            if self._cached(path):
+                return path
+            with self._lock:
+                self.misses += 1
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + '.tmp')
+            try:
+                write_export(data, tmp_path, label)
+                os.replace(tmp_path, path)
+            finally:
+                # A failed write leaves no partial file and no lock behind
+                tmp_path.unlink(missing_ok=True)
+                with self._lock:
+                    self._path_locks.pop(path, None)
+        with self._lock:
+            self._evict()
+        return path
+
+    def _cached(self, path):
+        with self._lock:
+            if not path.exists():
+                return False
+            self.hits += 1
+            os.utime(path)
+            return True
+
+    def _evict(self):
+        # Files still being written (.tmp) are left alone
+        files = sorted((p for p in self.cache_dir.glob("export-*") if p.suffix != '.tmp'),
+                       key=lambda p: p.stat().st_mtime_ns)
+        for old in files[:max(len(files) - self.max_files, 0)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def stats(self):
+        """Return hit/miss counters"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+# Process-wide cache shared by all sessions
+export_cache = ExportCache()
@@ -0,0 +1,91 @@
+"""
+Memoized figures: serialized Plotly JSON keyed by (dataset version,
+year range, sorted genres, chart id), with LRU eviction under a memory cap.
+A repeated selection skips both the pandas work and the figure building
+and serialization.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+FIGURE_CACHE_MAX_BYTES = int(float(os.environ.get("SPOTIFY_FIGURE_CACHE_MB", 64)) * 1024 * 1024)
+FIGURE_CACHE_MAX_ENTRIES = 512
+
+
+def figure_from_json(spec):
+    """Rebuild a Figure from cached JSON without re-validating it"""
+    import plotly.graph_objects as go
+
+    return go.Figure(json.loads(spec), skip_invalid=True, _validate=False)
+
+
+class FigureCache:
+    """LRU cache of serialized figures with a total size cap"""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_MAX_BYTES, max_entries=FIGURE_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(dataset_version, year_range, genres, search, chart_id, *extra):
+        """Cache key for a chart under a filter state (search: artist/title query)"""
+        return (dataset_version, tuple(year_range), tuple(sorted(genres)),
+                search.strip().lower(), chart_id) + extra
+
+    def get_json(self, key, build):
+        """Return the cached figure JSON, calling build() on a miss"""
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+
+        import plotly.io as pio
+
+        spec = pio.to_json(build(), validate=False)
+        size = len(spec)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = spec
+                self.size_bytes += size
+                while (self.size_bytes > self.max_bytes
+                       or len(self._entries) > self.max_entries):
+                    _, old = self._entries.popitem(last=False)
+                    self.size_bytes -= len(old)
+                    self.evictions += 1
+        return spec
+
+    def get_figure(self, key, build):
+        """Return the figure for key, building it on a miss"""
+        return figure_from_json(self.get_json(key, build))
+
+    def invalidate(self, dataset_version=None):
+        """Drop all entries, or only those of one dataset version"""
+        with self._lock:
+            for key in [k for k in self._entries
+                        if dataset_version is None or k[0] == dataset_version]:
+                self.size_bytes -= len(self._entries.pop(key))
+
+    def stats(self):
+        """Return hit/miss counters and size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size_mb': self.size_bytes / 1024 / 1024,
+            }
+
+
+# Process-wide cache shared by all sessions
+figure_cache = FigureCache()
@@ -0,0 +1,522 @@
+"""
+Figure builders for the charts (pure functions of the data; no Streamlit).
+Plotly is imported inside the builders so that importing this module (and
+starting the app) does not pay for plotly.express.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Scatter rendering modes (label shown in the sidebar -> mode id)
+SCATTER_MODES = {
+    'Auto': 'auto',
+    'All points': 'points',
+    'All points (WebGL)': 'webgl',
+    'Stratified sample': 'sample',
+    'Density (2D bins)': 'density',
+}
+
+SCATTER_MODE_LABELS = {
+    'points': 'all points',
+    'webgl': 'all points (WebGL)',
+    'sample': 'stratified sample',
+    'density': '2D density',
+}
+
+# Above this many points "Auto" switches to a stratified sample
+SCATTER_MAX_POINTS = int(os.environ.get("SPOTIFY_SCATTER_MAX_POINTS", 5000))
+
+DENSITY_BINS = 40
+
+# Distribution summaries (box/violin): exact quantiles up to this many rows,
+# histogram-sketch quantiles above it
+EXACT_QUANTILE_MAX_ROWS = 200_000
+SKETCH_BINS = 512
+KDE_GRID_SIZE = 64
+MAX_OUTLIERS = 50
+
+
+def stratified_sample(data, max_points, by='year', columns=('danceability', 'energy'),
+                      outlier_share=0.1, seed=0):
+    """
+    Sample at most max_points rows, proportionally per `by` group, always
+    keeping the most extreme rows (largest standardized distance from the
+    mean of `columns`) so outliers stay visible
+    """
+    n = len(data)
+    if n <= max_points:
+        return data
+
+    values = data[list(columns)].to_numpy(dtype=np.float64)
+    std = values.std(axis=0)
+    std[std == 0] = 1
+    distance = (((values - values.mean(axis=0)) / std) ** 2).sum(axis=1)
+
+    n_outliers = int(max_points * outlier_share)
+    outliers = np.argpartition(distance, n - n_outliers)[n - n_outliers:] if n_outliers else \
+        np.empty(0, dtype=np.int64)
+
+    rest = np.ones(n, dtype=bool)
+    rest[outliers] = False
+    rest_ids = np.flatnonzero(rest)
+
+    # Proportional allocation per group, in random order within each group
+    rng = np.random.default_rng(seed)
+    groups = data[by].to_numpy()[rest_ids]
+    shuffled = rng.permutation(len(rest_ids))
+    order = shuffled[np.argsort(groups[shuffled], kind='stable')]
+    _, group_start, group_size = np.unique(groups[order], return_index=True,
+                                     return_counts=True)
+    budget = max_points - n_outliers
+    quota = np.maximum(np.floor(group_size * budget / len(rest_ids)).astype(np.int64), 1)
+    rank = np.arange(len(order)) - np.repeat(group_start, group_size)
+    chosen = rest_ids[order[rank < np.repeat(quota, group_size)]]
+
+    return data.iloc[np.sort(np.concatenate([outliers, chosen]))]
+
+
+def density_bins(x, y, weights, bins=DENSITY_BINS):
+    """2D histogram of x/y: bin centers, counts and mean weight per bin"""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    weight_sums, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges], weights=weights)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_weight = weight_sums / counts
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centers, y_centers, counts, mean_weight
+
+
+def resolve_scatter_mode(mode, n_points, max_points=SCATTER_MAX_POINTS):
+    """Concrete rendering mode for the number of points"""
+    if mode == 'auto':
+        return 'points' if n_points <= max_points else 'sample'
+    return mode
+
+
+def build_scatter_figure(data, mode='auto', max_points=SCATTER_MAX_POINTS):
+    """
+    Danceability vs energy chart in the requested rendering mode.
+    Returns (figure, mode used, number of points drawn)
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    mode = resolve_scatter_mode(mode, len(data), max_points)
+    title = 'Danceability vs Energy (Bubble size represents popularity)'
+    labels = {
+        'danceability': 'Danceability',
+        'energy': 'Energy',
+        'year': 'Year'
+    }
+
+    if mode == 'density':
+        x_centers, y_centers, counts, mean_pop = density_bins(
+            data['danceability'].to_numpy(dtype=np.float64),
+            data['energy'].to_numpy(dtype=np.float64),
+            data['popularity'].to_numpy(dtype=np.float64))
+        fig = go.Figure(go.Heatmap(
+            x=x_centers,
+            y=y_centers,
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            customdata=mean_pop.T,
+            colorscale='Viridis',
+            colorbar=dict(title='Songs'),
+            hovertemplate='Danceability %{x:.1f}<br>Energy %{y:.1f}<br>'
+                          'Songs %{z}<br>Mean popularity %{customdata:.1f}<extra></extra>',
+            name='Density'
+        ))
+        fig.update_layout(
+            title='Danceability vs Energy (Song density, hover for mean popularity)',
+            xaxis_title='Danceability',
+            yaxis_title='Energy',
+            height=500
+        )
+        return fig, mode, int(np.count_nonzero(counts))
+
+    if mode == 'sample':
+        data = stratified_sample(data, max_points)
+
+    fig = px.scatter(
+        data,
+        x='danceability',
+        y='energy',
+        color='year',
+        size='popularity',
+        hover_data=['title', 'artist', 'genre'],
+        color_continuous_scale='Viridis',
+        title=title,
+        labels=labels,
+        render_mode='webgl' if mode == 'webgl' else 'auto',
+        height=500
+    )
+    return fig, mode, len(data)
+
+
+def _sketch_quantiles(hist, edges, qs):
+    """Approximate quantiles per row of a histogram matrix (linear within bins)"""
+    cum = np.cumsum(hist, axis=1)
+    n = cum[:, -1:]
+    result = np.empty((hist.shape[0], len(qs)))
+    for k, q in enumerate(qs):
+        target = q * n
+        bin_idx = np.argmax(cum >= target, axis=1)
+        rows = np.arange(hist.shape[0])
+        before = np.where(bin_idx > 0, cum[rows, bin_idx - 1], 0)
+        in_bin = np.maximum(hist[rows, bin_idx], 1)
+        frac = np.clip((target[:, 0] - before) / in_bin, 0, 1)
+        result[:, k] = edges[bin_idx] + frac * (edges[bin_idx + 1] - edges[bin_idx])
+    return result
+
+
+def distribution_summary(data, column, by='genre', grid_size=KDE_GRID_SIZE,
+                         exact_max_rows=EXACT_QUANTILE_MAX_ROWS, sketch_bins=SKETCH_BINS,
+                         max_outliers=MAX_OUTLIERS):
+    """
+    Per-group box statistics (quartiles, 1.5 IQR whiskers, capped outliers)
+    and a fixed-grid binned Gaussian KDE of a column. The size of the result
+    depends on the number of groups, not on the number of rows.
+    """
+    codes, groups = pd.factorize(data[by], sort=True)
+    values = data[column].to_numpy(dtype=np.float64)
+    n_groups = len(groups)
+    if n_groups == 0:
+        return []
+
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    sumsq = np.bincount(codes, weights=values * values, minlength=n_groups)
+    means = sums / counts
+    stds = np.sqrt(np.maximum(sumsq / counts - means ** 2, 0))
+
+    # Histogram sketch per group (also the input of the binned KDE)
+    low, high = values.min(), values.max()
+    span = (high - low) or 1.0
+    edges = low + span * np.arange(sketch_bins + 1) / sketch_bins
+    bin_idx = np.minimum(((values - low) / span * sketch_bins).astype(np.int64), sketch_bins - 1)
+    hist = np.bincount(codes * sketch_bins + bin_idx,
+                       minlength=n_groups * sketch_bins).reshape(n_groups, sketch_bins)
+
+    if len(values) <= exact_max_rows:
+        # Exact: one sort by (group, value), quantiles by index interpolation
+        sorted_values = values[np.lexsort((values, codes))]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        quartiles = np.empty((n_groups, 3))
+        for k, q in enumerate((0.25, 0.5, 0.75)):
+            pos = starts + q * (counts - 1)
+            below, above = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+            quartiles[:, k] = (sorted_values[below]
+                               + (pos - below) * (sorted_values[above] - sorted_values[below]))
+        mins = sorted_values[starts]
+        maxs = sorted_values[starts + counts - 1]
+    else:
+        sorted_values = None
+        quartiles = _sketch_quantiles(hist, edges, (0.25, 0.5, 0.75))
+        nonempty = hist > 0
+        mins = edges[np.argmax(nonempty, axis=1)]
+        maxs = edges[sketch_bins - np.argmax(nonempty[:, ::-1], axis=1)]
+
+    q1, median, q3 = quartiles.T
+    iqr = q3 - q1
+
+    # Binned Gaussian KDE (Scott's rule) on a fixed per-group grid
+    centers = (edges[:-1] + edges[1:]) / 2
+    bandwidth = np.maximum(1.06 * stds * counts ** -0.2, span / sketch_bins)
+    steps = np.linspace(0, 1, grid_size)
+    grid = mins[:, None] + steps[None, :] * (maxs - mins)[:, None]
+    z = (grid[:, :, None] - centers[None, None, :]) / bandwidth[:, None, None]
+    kernel = np.exp(-0.5 * z * z)
+    density = np.einsum('gb,gkb->gk', hist, kernel) / (counts * bandwidth * np.sqrt(2 * np.pi))[:, None]
+
+    summaries = []
+    for g, group in enumerate(groups):
+        lower_limit, upper_limit = q1[g] - 1.5 * iqr[g], q3[g] + 1.5 * iqr[g]
+        if sorted_values is not None:
+            segment = sorted_values[starts[g]:starts[g] + counts[g]]
+            inside = segment[(segment >= lower_limit) & (segment <= upper_limit)]
+            lower_fence, upper_fence = (inside[0], inside[-1]) if len(inside) else (q1[g], q3[g])
+            low_out = segment[segment < lower_limit]
+            high_out = segment[segment > upper_limit]
+            outliers = np.concatenate([low_out[:max_outliers // 2],
+                                       high_out[len(high_out) - max_outliers // 2:]])
+        else:
+            lower_fence = max(lower_limit, mins[g])
+            upper_fence = min(upper_limit, maxs[g])
+            outliers = np.empty(0)
+        summaries.append({
+            'group': group,
+            'n': int(counts[g]),
+            'mean': means[g],
+            'min': mins[g],
+            'max': maxs[g],
+            'q1': q1[g],
+            'median': median[g],
+            'q3': q3[g],
+            'lowerfence': lower_fence,
+            'upperfence': upper_fence,
+            'outliers': outliers,
+            'kde_x': grid[g],
+            'kde_y': density[g],
+        })
+    return summaries
+
+
+def build_box_figure(summaries, title, y_label, colors, height=400):
+    """Box plot from precomputed distribution summaries"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for k, summary in enumerate(summaries):
+        color = colors[k % len(colors)]
+        fig.add_trace(go.Box(
+            x=[summary['group']],
+            q1=[summary['q1']],
+            median=[summary['median']],
+            q3=[summary['q3']],
+            lowerfence=[summary['lowerfence']],
+            upperfence=[summary['upperfence']],
+            mean=[summary['mean']],
+            name=summary['group'],
+            marker_color=color,
+            boxpoints=False
+        ))
+        if len(summary['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[summary['group']] * len(summary['outliers']),
+                y=summary['outliers'],
+                mode='markers',
+                marker=dict(color=color, size=5),
+                name=summary['group'],
+                showlegend=False,
+                hovertemplate=f"{summary['group']}<br>%{{y:.2f}}<extra></extra>"
+            ))
+    fig.update_layout(title=title, xaxis_title='Genre', yaxis_title=y_label, height=height)
+    return fig
+
+
+def build_violin_figure(summaries, title, y_label, colors, height=400, half_width=0.4):
+    """Violin plot (KDE outline plus inner box) from precomputed summaries"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    peak = max((s['kde_y'].max() for s in summaries if s['n']), default=1) or 1
+    for k, summary in enumerate(summaries):
+        color = colors[k % len(colors)]
+        width = summary['kde_y'] / peak * half_width
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([k - width, (k + width)[::-1]]),
+            y=np.concatenate([summary['kde_x'], summary['kde_x'][::-1]]),
+            fill='toself',
+            mode='lines',
+            line=dict(color=color, width=1),
+            name=summary['group'],
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Box(
+            x=[k],
+            q1=[summary['q1']],
+            median=[summary['median']],
+            q3=[summary['q3']],
+            lowerfence=[summary['lowerfence']],
+            upperfence=[summary['upperfence']],
+            name=summary['group'],
+            marker_color=color,
+            width=0.08,
+            boxpoints=False,
+            showlegend=False
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis=dict(title='Genre', tickmode='array', tickvals=list(range(len(summaries))),
+                   ticktext=[s['group'] for s in summaries]),
+        yaxis_title=y_label,
+        height=height
+    )
+    return fig
+
+
+def build_danceability_energy_figure(filtered, moments, scatter_mode='auto'):
+    """Question 1 scatter plot with the least-squares trend line"""
+    import plotly.graph_objects as go
+
+    fig1, scatter_mode_used, points_drawn = build_scatter_figure(filtered, scatter_mode)
+
+    # Add trend line (least squares from the merged cube moments)
+    p = np.poly1d(moments.linear_fit('danceability', 'energy'))
+    x_trend = np.linspace(filtered['danceability'].min(),
+                          filtered['danceability'].max(), 100)
+
+    fig1.add_trace(go.Scatter(
+        x=x_trend,
+        y=p(x_trend),
+        mode='lines',
+        name='Trend Line',
+        line=dict(color='#ef4444', width=2, dash='dash')
+    ))
+
+    fig1.update_layout(
+        plot_bgcolor='white',
+        font=dict(size=12, family='Inter'),
+        showlegend=True,
+        paper_bgcolor='rgba(0,0,0,0)',
+        meta=dict(mode=scatter_mode_used, points_drawn=points_drawn)
+    )
+    return fig1
+
+
+def build_trend_figure(yearly_avg):
+    """Annual average danceability/energy mini chart"""
+    import plotly.graph_objects as go
+
+    fig_trend = go.Figure()
+    fig_trend.add_trace(go.Scatter(
+        x=yearly_avg['year'],
+        y=yearly_avg['danceability'],
+        name='Danceability',
+        line=dict(color='#667eea', width=3),
+        fill='tonexty'
+    ))
+    fig_trend.add_trace(go.Scatter(
+        x=yearly_avg['year'],
+        y=yearly_avg['energy'],
+        name='Energy',
+        line=dict(color='#764ba2', width=3)
+    ))
+    fig_trend.update_layout(
+        title='Annual Average Trend',
+        height=250,
+        margin=dict(l=20, r=20, t=40, b=20),
+        plot_bgcolor='white',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter')
+    )
+    return fig_trend
+
+
+def build_genre_year_figure(genre_year, year_range):
+    """Question 2 stacked bar chart of song counts per year and genre"""
+    import plotly.express as px
+    from plotly.colors import qualitative
+
+    fig2 = px.bar(
+        genre_year,
+        x='year',
+        y='count',
+        color='genre',
+        title='Annual Song Count Change by Genre (Stacked View)',
+        labels={'count': 'Song Count', 'year': 'Year', 'genre': 'Genre'},
+        color_discrete_sequence=qualitative.Set3,
+        height=450
+    )
+
+    fig2.update_layout(
+        barmode='stack',
+        plot_bgcolor='white',
+        xaxis=dict(tickmode='linear', tick0=year_range[0], dtick=1),
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter')
+    )
+    return fig2
+
+
+def build_duration_figure(filtered):
+    """Duration box plot per genre, built from per-genre summaries"""
+    from plotly.colors import qualitative
+
+    fig3 = build_box_figure(
+        distribution_summary(filtered, 'duration_min'),
+        title='Song Duration Distribution by Genre',
+        y_label='Duration (minutes)',
+        colors=qualitative.Pastel,
+        height=400
+    )
+
+    fig3.update_layout(
+        plot_bgcolor='white',
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter')
+    )
+    return fig3
+
+
+def build_popularity_figure(filtered):
+    """Popularity violin plot per genre, built from per-genre summaries"""
+    from plotly.colors import qualitative
+
+    fig4 = build_violin_figure(
+        distribution_summary(filtered, 'popularity'),
+        title='Popularity Distribution by Genre',
+        y_label='Popularity Rating',
+        colors=qualitative.Plotly,
+        height=400
+    )
+
+    fig4.update_layout(
+        plot_bgcolor='white',
+        showlegend=False,
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter')
+    )
+    return fig4
+
+
+def build_correlation_heatmap_figure(correlations):
+    """
+    Question 3 feature correlation heatmap: the whole selection first,
+    then one animation frame per year
+    """
+    import plotly.graph_objects as go
+
+    labels = [f.capitalize() for f in correlations['features']]
+    steps = [('All years', correlations['selection'])]
+    steps += [(str(year), corr) for year, corr in zip(correlations['years'],
+                                                      correlations['by_year'])]
+
+    def heatmap(corr):
+        return go.Heatmap(
+            z=np.round(corr, 3),
+            x=labels,
+            y=labels,
+            zmin=-1,
+            zmax=1,
+            colorscale='RdBu',
+            reversescale=True,
+            texttemplate='%{z:.2f}',
+            colorbar=dict(title='r')
+        )
+
+    fig5 = go.Figure(data=[heatmap(steps[0][1])],
+                     frames=[go.Frame(data=[heatmap(corr)], name=name) for name, corr in steps])
+
+    frame_args = dict(mode='immediate', frame=dict(duration=700, redraw=True),
+                      transition=dict(duration=0))
+    fig5.update_layout(
+        title='Audio Feature Correlations by Year',
+        height=550,
+        yaxis=dict(autorange='reversed'),
+        plot_bgcolor='white',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter'),
+        updatemenus=[dict(
+            type='buttons',
+            showactive=False,
+            x=0,
+            y=-0.12,
+            xanchor='left',
+            buttons=[dict(label='▶ Play', method='animate',
+                          args=[[name for name, _ in steps[1:]], frame_args]),
+                     dict(label='⏸ Pause', method='animate',
+                          args=[[None], dict(frame_args, mode='immediate',
+                                             frame=dict(duration=0, redraw=False))])]
+        )],
+        sliders=[dict(
+            x=0.15,
+            y=-0.05,
+            len=0.85,
+            currentvalue=dict(prefix='Year: '),
+            steps=[dict(label=name, method='animate', args=[[name], frame_args])
+                   for name, _ in steps]
+        )]
+    )
+    return fig5
@@ -0,0 +1,100 @@
+"""
+Precomputed (year, genre) index: row positions sorted by year then genre,
+plus an offset table so any year-range/genre selection is a concatenation
+of slices instead of boolean masks over the whole frame.
+"""
+import numpy as np
+import pandas as pd
+
+
+class YearGenreIndex:
+    """Row positions grouped by (year, genre) cell"""
+
+    def __init__(self, data):
+        genre = data['genre']
+        if isinstance(genre.dtype, pd.CategoricalDtype):
+            genre_codes = genre.cat.codes.to_numpy()
+            self.genres = list(genre.cat.categories)
+        else:
+            genre_codes, categories = pd.factorize(genre, sort=True)
+            self.genres = list(categories)
+
+        year = data['year'].to_numpy()
+        self.years = np.unique(year)
+        year_codes = np.searchsorted(self.years, year)
+
+        n_genres = max(len(self.genres), 1)
+        cells = year_codes.astype(np.int64) * n_genres + genre_codes
+
+        self.n_rows = len(data)
+        self.n_genres = n_genres
+        self._genre_lookup = {g: i for i, g in enumerate(self.genres)}
+        # Cell of every row, to intersect other position sets with a selection
+        self.row_cells = cells.astype(np.int32)
+        # Stable sort keeps the original row order within each cell
+        self.order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=len(self.years) * n_genres)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def cell_ids(self, year_range, genres):
+        """Cell numbers for a year range and a list of genres"""
+        first = np.searchsorted(self.years, year_range[0], side='left')
+        last = np.searchsorted(self.years, year_range[1], side='right')
+        genre_ids = np.array([self._genre_lookup[g] for g in genres if g in self._genre_lookup],
+                             dtype=np.int64)
+        year_ids = np.arange(first, last, dtype=np.int64)
+        return (year_ids[:, None] * self.n_genres + genre_ids[None, :]).ravel()
+
+    def positions(self, year_range, genres):
+        """Row positions (grouped by year, then genre) matching the selection"""
+        cells = self.cell_ids(year_range, genres)
+        starts = self.offsets[cells]
+        lengths = self.offsets[cells + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=self.order.dtype)
+
+        # Vectorized concatenation of order[start:start + length] slices
+        skip = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.order[np.arange(total) + skip]
+
+    def intersect(self, positions, year_range, genres):
+        """
+        Those of sorted row positions that match the selection, in positions() order,
+        by looking up their cells (cost grows with len(positions), not the selection)
+        """
+        cells = self.cell_ids(year_range, genres)
+        if len(positions) > self.n_rows // 8:
+            # Most rows match: filter the selection with a mask instead
+            hit = np.zeros(self.n_rows, dtype=bool)
+            hit[positions] = True
+            selected = self.positions(year_range, genres)
+            return selected[hit[selected]]
+
+        # Small rank dtypes get a radix sort from numpy's stable argsort
+        rank_dtype = np.int16 if len(cells) < 2 ** 15 else np.int64
+        rank = np.full(len(self.offsets) - 1, -1, dtype=rank_dtype)
+        rank[cells] = np.arange(len(cells))
+        row_rank = rank[self.row_cells[positions]]
+        keep = row_rank >= 0
+        positions, row_rank = positions[keep], row_rank[keep]
+        return positions[np.argsort(row_rank, kind='stable')]
+
+    def count(self, year_range, genres):
+        """Number of rows matching the selection, without materializing them"""
+        cells = self.cell_ids(year_range, genres)
+        return int((self.offsets[cells + 1] - self.offsets[cells]).sum())
+
+
+def filter_frame(data, index, year_range, genres):
+    """Rows of data in year_range (inclusive) and genres, using the index"""
+    return data.take(index.positions(year_range, genres))
+
+
+def filter_frame_mask(data, year_range, genres):
+    """Boolean-mask filter (reference implementation)"""
+    return data[
+        (data['year'] >= year_range[0]) &
+        (data['year'] <= year_range[1]) &
+        (data['genre'].isin(genres))
+    ]
@@ -0,0 +1,108 @@
+"""
+"Songs like this": nearest neighbours by audio features. Feature vectors
+are standardized into one float32 array and indexed by a KD-tree
+(scipy cKDTree) once per dataset version. Queries restricted to the
+current filters widen the tree search until enough neighbours fall inside
+the selection, and scan the selection directly when it is small.
+"""
+import numpy as np
+import pandas as pd
+
+SIMILARITY_FEATURES = ['danceability', 'energy', 'valence', 'acousticness', 'speechiness',
+                       'liveness', 'loudness', 'bpm']
+SIMILAR_COLUMNS = ['title', 'artist', 'year', 'genre', 'danceability', 'energy', 'valence']
+
+# Selections up to this size are scanned instead of searched in the tree
+BRUTE_FORCE_MAX_ROWS = 50_000
+# Most tree candidates fetched before falling back to a scan of the selection
+TREE_MAX_CANDIDATES = 20_000
+
+
+def standardize(data, features):
+    """Features as a float32 (rows, features) array with zero mean and unit variance"""
+    values = data[features].to_numpy(dtype=np.float32)
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0)
+    std[~(std > 0)] = 1
+    values -= mean
+    values /= std
+    # Missing values sit at the feature mean
+    np.nan_to_num(values, copy=False)
+    return values
+
+
+def brute_force_neighbors(values, point, k, candidates):
+    """(positions, distances) of the k candidates nearest to point, by a full scan"""
+    k = min(k, len(candidates))
+    if k == 0:
+        return candidates[:0], np.empty(0)
+    diff = values[candidates] - point
+    dist = np.einsum('ij,ij->i', diff, diff)
+    nearest = np.argpartition(dist, k - 1)[:k] if k < len(dist) else np.arange(len(dist))
+    nearest = nearest[np.argsort(dist[nearest], kind='stable')]
+    return candidates[nearest], np.sqrt(dist[nearest]).astype(np.float64)
+
+
+class SongIndex:
+    """KD-tree over the standardized audio features of every song"""
+
+    def __init__(self, data, features=SIMILARITY_FEATURES):
+        from scipy.spatial import cKDTree
+
+        self.features = [f for f in features if f in data.columns]
+        self.values = standardize(data, self.features)
+        self.n_rows = len(self.values)
+        self.tree = cKDTree(self.values, leafsize=32, balanced_tree=False, compact_nodes=False)
+
+    def query(self, position, k=10, allowed=None, exclude=()):
+        """
+        (positions, distances) of the k songs nearest to the song at position,
+        among allowed row positions (all if None), never returning exclude
+        """
+        point = self.values[position]
+        keep = np.zeros(self.n_rows, dtype=bool)
+        if allowed is None:
+            keep[:] = True
+        else:
+            keep[allowed] = True
+        keep[position] = False
+        keep[np.asarray(exclude, dtype=np.int64)] = False
+        n_allowed = int(keep.sum())
+
+        if n_allowed > BRUTE_FORCE_MAX_ROWS:
+            # Enough candidates that k of them are likely allowed, widened if not
+            n_candidates = int((k + 1) * self.n_rows / n_allowed * 2) + len(exclude) + 1
+            while n_candidates <= TREE_MAX_CANDIDATES:
+                dist, idx = self.tree.query(point, k=min(n_candidates, self.n_rows))
+                found = idx < self.n_rows
+                dist, idx = dist[found], idx[found]
+                hits = keep[idx]
+                if hits.sum() >= k or len(idx) == self.n_rows:
+                    return idx[hits][:k], dist[hits][:k]
+                n_candidates *= 4
+        return brute_force_neighbors(self.values, point, k, np.flatnonzero(keep))
+
+
+def same_song_positions(data, position):
+    """Row positions of every row with the song's title and artist (the song itself included)"""
+    artist = data['artist']
+    if isinstance(artist.dtype, pd.CategoricalDtype):
+        codes = artist.cat.codes.to_numpy()
+        candidates = np.flatnonzero(codes == codes[position])
+    else:
+        candidates = np.flatnonzero(artist.to_numpy() == artist.iloc[position])
+    titles = data['title'].to_numpy()[candidates]
+    return candidates[titles == data['title'].iloc[position]]
+
+
+def song_label(data, position):
+    """'Title - Artist (year)' of one row"""
+    row = data.iloc[position]
+    return f"{row['title']} - {row['artist']} ({row['year']})"
+
+
+def similar_songs_frame(data, positions, distances, columns=SIMILAR_COLUMNS):
+    """The neighbours as a DataFrame with their feature distance"""
+    frame = data.take(positions)[[c for c in columns if c in data.columns]]
+    frame.insert(0, 'distance', np.round(distances, 3))
+    return frame
@@ -0,0 +1,43 @@
+"""
+Optional concurrent chart computation: each chart's data preparation and
+figure serialization runs on a shared thread pool, and figures are handed
+back in completion order so the page can fill placeholders as they finish.
+Enabled with SPOTIFY_PARALLEL_CHARTS=1; SPOTIFY_CHART_WORKERS sets the pool size.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+PARALLEL_ENV = "SPOTIFY_PARALLEL_CHARTS"
+CHART_WORKERS = int(os.environ.get("SPOTIFY_CHART_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def parallel_charts_enabled():
+    """True if concurrent chart computation is switched on"""
+    return os.environ.get(PARALLEL_ENV, "").lower() in ("1", "true", "yes")
+
+
+def make_chart_pool(max_workers=CHART_WORKERS):
+    """Thread pool for chart jobs (numpy/pandas and JSON encoding release the GIL in places)"""
+    return ThreadPoolExecutor(max_workers=max(int(max_workers), 1), thread_name_prefix="chart")
+
+
+def _timed_json(cache, key, build):
+    start = time.perf_counter()
+    spec = cache.get_json(key, build)
+    return spec, (time.perf_counter() - start) * 1000
+
+
+def iter_chart_specs(jobs, cache, pool=None):
+    """
+    Iterate (chart_id, figure JSON, build ms) for jobs {chart_id: (cache key, build)}:
+    built one after another while iterating without a pool, or submitted to the
+    pool right away and yielded in completion order
+    """
+    if pool is None:
+        return ((chart_id,) + _timed_json(cache, key, build)
+                for chart_id, (key, build) in jobs.items())
+
+    futures = {pool.submit(_timed_json, cache, key, build): chart_id
+               for chart_id, (key, build) in jobs.items()}
+    return ((futures[future],) + future.result() for future in as_completed(futures))
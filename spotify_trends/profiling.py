@@ -0,0 +1,115 @@
+"""
+Per-rerun hot-path profiler: wall time and memory of each named stage,
+appended as JSON lines to a log file for offline analysis.
+When disabled, stage() returns a shared no-op context manager.
+Memory tracking uses tracemalloc, which traces every allocation of the
+process once started, so it is only switched on by SPOTIFY_PROFILE (never
+by a visitor's ?profile=1). Its peak is process-wide: stages of concurrent
+profiled sessions share it and their peak numbers are not isolated.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROFILE_ENV = "SPOTIFY_PROFILE"
+PROFILE_LOG = Path(os.environ.get(
+    "SPOTIFY_PROFILE_LOG",
+    Path(__file__).resolve().parent.parent / "logs" / "timings.jsonl"))
+
+_NULL_STAGE = contextlib.nullcontext()
+_log_lock = threading.Lock()
+
+
+def profiling_requested(query_params=None):
+    """True if profiling is enabled by the env var or a ?profile=1 query param"""
+    if os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes"):
+        return True
+    if query_params is not None:
+        return str(query_params.get("profile", "")).lower() in ("1", "true", "yes")
+    return False
+
+
+def memory_tracking_requested():
+    """True if per-stage memory tracking is enabled (SPOTIFY_PROFILE only)"""
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+class RerunProfiler:
+    """Collects per-stage timings for one script run"""
+
+    def __init__(self, enabled=False, log_path=PROFILE_LOG, track_memory=True, scope="full"):
+        self.enabled = enabled
+        self.log_path = Path(log_path)
+        self.track_memory = enabled and track_memory
+        self.scope = scope
+        self.records = []
+        self.finished = False
+        self._start = time.perf_counter()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name):
+        """Context manager timing the enclosed block as `name`"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed_stage(name)
+
+    @contextlib.contextmanager
+    def _timed_stage(self, name):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'stage': name, 'ms': (time.perf_counter() - start) * 1000}
+            if self.track_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                record['mem_delta_kb'] = (current - mem_start) / 1024
+                record['mem_peak_kb'] = (peak - mem_start) / 1024
+            self.records.append(record)
+
+    def record(self, name, ms):
+        """Add a stage timed elsewhere (e.g. on a worker thread)"""
+        if self.enabled:
+            self.records.append({'stage': name, 'ms': ms})
+
+    def for_fragment(self, name):
+        """
+        Profiler for a fragment: this one while the full run is in progress,
+        a fresh one when the fragment reruns on its own after the full run
+        """
+        if not self.finished:
+            return self
+        return RerunProfiler(self.enabled, self.log_path, self.track_memory,
+                             scope=f"fragment:{name}")
+
+    def total_ms(self):
+        """Wall time since the profiler was created"""
+        return (time.perf_counter() - self._start) * 1000
+
+    def write_log(self, **extra):
+        """Append this run's timings as one JSON line"""
+        self.finished = True
+        if not self.enabled:
+            return
+        line = json.dumps({
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'scope': self.scope,
+            'total_ms': self.total_ms(),
+            'stages': self.records,
+            **extra,
+        })
+        try:
+            with _log_lock:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️ Could not write profile log: {e}")
@@ -0,0 +1,128 @@
+"""
+Dataset hot-reload: the source file is versioned by its content hash.
+A cheap size/mtime check runs at most every few seconds; when it changes
+(and the file has stopped changing), the new version is hashed (once, the
+store reuses the hash) and its caches are warmed on a background thread,
+then swapped in atomically.
+Reruns never wait for a reload: they keep the current version until the
+new one is fully built.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+from spotify_trends.store import source_hash
+
+RELOAD_CHECK_INTERVAL = float(os.environ.get("SPOTIFY_RELOAD_INTERVAL", 5.0))
+# Seconds a replaced version stays cached, so runs and fragments started before the swap can finish
+RELEASE_GRACE_PERIOD = float(os.environ.get("SPOTIFY_RELEASE_GRACE", 60.0))
+
+
+class StaleVersionError(ValueError):
+    """Raised when the source file no longer holds the requested dataset version"""
+
+    def __init__(self, requested, found):
+        super().__init__(f"dataset version {requested} was requested but the file holds {found}")
+        self.requested = requested
+        self.found = found
+
+
+def dataset_version(path):
+    """Version of a source file: its short content hash (None if missing)"""
+    try:
+        # Read from the converted file's metadata while the source is untouched
+        return source_hash(path)[:16]
+    except FileNotFoundError:
+        return None
+
+
+def check_version(data, version):
+    """Return data if it is the requested version (untagged data is accepted), else raise"""
+    found = data.attrs.get('dataset_version')
+    if version is not None and found is not None and found != version:
+        raise StaleVersionError(version, found)
+    return data
+
+
+def release_later(release, version, delay=RELEASE_GRACE_PERIOD):
+    """Call release(version) on a background timer after the grace period"""
+    timer = threading.Timer(delay, release, args=(version,))
+    timer.name = "dataset-release"
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class DatasetWatcher:
+    """Tracks the current dataset version of a source file and reloads it in the background"""
+
+    def __init__(self, path, warm=None, on_swap=None, check_interval=RELOAD_CHECK_INTERVAL,
+                 settle=1.0):
+        self.path = Path(path)
+        self.warm = warm
+        self.on_swap = on_swap
+        self.check_interval = check_interval
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._stat = self._stat_key()
+        self._last_check = time.monotonic()
+        self._reloading = False
+        self.version = dataset_version(self.path)
+        self.reloads = 0
+        self.last_error = None
+
+    def _stat_key(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def poll(self):
+        """Return the current version, starting a background reload if the file changed"""
+        now = time.monotonic()
+        with self._lock:
+            if self._reloading or now - self._last_check < self.check_interval:
+                return self.version
+            self._last_check = now
+            stat = self._stat_key()
+            if stat == self._stat:
+                return self.version
+            self._reloading = True
+        threading.Thread(target=self._reload, name="dataset-reload", daemon=True).start()
+        return self.version
+
+    def _wait_until_stable(self):
+        """Wait for a writer to finish: the size/mtime must not change for `settle` seconds"""
+        stat = self._stat_key()
+        while True:
+            time.sleep(self.settle)
+            current = self._stat_key()
+            if current == stat:
+                return current
+            stat = current
+
+    def _reload(self):
+        try:
+            stat = self._wait_until_stable()
+            version = dataset_version(self.path)
+            if version is not None and version != self.version:
+                # Build everything for the new version before anyone can see it
+                if self.warm:
+                    self.warm(version)
+                with self._lock:
+                    old, self.version = self.version, version
+                    self.reloads += 1
+                print(f"🔄 Dataset reloaded: {old} -> {version}")
+                if self.on_swap:
+                    self.on_swap(old, version)
+            with self._lock:
+                self._stat = stat
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+            print(f"⚠️ Dataset reload failed, keeping version {self.version}: {e}")
+        finally:
+            with self._lock:
+                self._reloading = False
@@ -0,0 +1,124 @@
+"""
+Compact dtype model for the loaded DataFrame: numeric columns are downcast
+to the smallest type that holds their values, genre/artist become pandas
+categoricals, and audio feature ranges are validated.
+
+Usage: python -m spotify_trends.schema [--rows 5000000]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Expected value range of each numeric column (None = unbounded)
+FEATURE_RANGES = {
+    'danceability': (0, 100),
+    'energy': (0, 100),
+    'popularity': (0, 100),
+    'valence': (0, 100),
+    'acousticness': (0, 100),
+    'speechiness': (0, 100),
+    'liveness': (0, 100),
+    'loudness': (None, 0),
+    'bpm': (0, None),
+    'duration_ms': (0, None),
+    'year': (None, None),
+}
+
+# Audio feature columns shown in the analyses
+AUDIO_FEATURES = ['danceability', 'energy', 'popularity', 'valence', 'acousticness',
+                  'speechiness', 'liveness', 'loudness', 'bpm']
+
+CATEGORY_COLUMNS = ['genre', 'artist']
+
+# Float columns that only need single precision
+FLOAT32_COLUMNS = ['duration_min']
+
+_INTEGER_DTYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32]
+
+
+def smallest_integer_dtype(min_value, max_value):
+    """Smallest NumPy integer dtype holding [min_value, max_value]"""
+    for dtype in _INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def downcast_column(values):
+    """Return the column downcast to the smallest safe numeric type"""
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return values
+    if len(values) == 0 or values.isna().any():
+        return values.astype(np.float32) if values.dtype == np.float64 else values
+
+    array = values.to_numpy()
+    if pd.api.types.is_float_dtype(values) and not np.array_equal(array, np.round(array)):
+        return values
+    return values.astype(smallest_integer_dtype(array.min(), array.max()))
+
+
+def apply_schema(data):
+    """Return a copy of the DataFrame with compact dtypes"""
+    data = data.copy()
+    for col in FEATURE_RANGES:
+        if col in data.columns:
+            data[col] = downcast_column(data[col])
+    for col in FLOAT32_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype(np.float32)
+    for col in CATEGORY_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    return data.reset_index(drop=True)
+
+
+def validate_ranges(data):
+    """Return {column: number of out-of-range values} for violated columns"""
+    violations = {}
+    for col, (low, high) in FEATURE_RANGES.items():
+        if col not in data.columns:
+            continue
+        values = data[col]
+        bad = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            bad |= (values < low).to_numpy()
+        if high is not None:
+            bad |= (values > high).to_numpy()
+        if bad.any():
+            violations[col] = int(bad.sum())
+    return violations
+
+
+def _format_bytes(n_bytes):
+    if n_bytes >= 1e6:
+        return f"{n_bytes / 1e6:.1f}MB"
+    return f"{n_bytes / 1e3:.1f}KB"
+
+
+def memory_report(before, after):
+    """Return a per-column memory comparison table as text"""
+    mem_before = before.memory_usage(deep=True, index=False)
+    mem_after = after.memory_usage(deep=True, index=False)
+    lines = [f"{'column':<16}{'dtype':>12}{'before':>12}{'after':>12}"]
+    for col in after.columns:
+        lines.append(f"{col:<16}{str(after[col].dtype):>12}"
+                     f"{_format_bytes(mem_before.get(col, 0)):>12}{_format_bytes(mem_after[col]):>12}")
+    total_before, total_after = mem_before.sum(), mem_after.sum()
+    lines.append(f"{'total':<16}{'':>12}{_format_bytes(total_before):>12}{_format_bytes(total_after):>12}"
+                 f"  ({(1 - total_after / total_before) * 100:.0f}% smaller)")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    from spotify_trends.synthetic import make_spotify_frame
+
+    parser = argparse.ArgumentParser(description="Show the memory reduction on synthetic data")
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    raw = make_spotify_frame(args.rows)
+    compact = apply_schema(raw)
+    print(memory_report(raw, compact))
+    print("Range violations:", validate_ranges(compact) or "none")
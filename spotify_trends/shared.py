@@ -0,0 +1,39 @@
+"""
+Process-wide dataset: one immutable DataFrame held in st.cache_resource
+and shared by every session. Its column buffers are made read-only, and
+each session works on a shallow (zero-copy) view plus its own filtered
+row positions instead of a private unpickled copy.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _readonly(values):
+    values = np.array(values, copy=True)
+    values.flags.writeable = False
+    return values
+
+
+def freeze_frame(data):
+    """Copy of data whose numeric and categorical buffers are read-only"""
+    columns = {}
+    for name in data.columns:
+        column = data[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            columns[name] = pd.Categorical.from_codes(_readonly(column.cat.codes.to_numpy()),
+                                                      dtype=column.dtype)
+        elif isinstance(column.dtype, np.dtype) and column.dtype.kind in 'biuf':
+            columns[name] = _readonly(column.to_numpy())
+        else:
+            # Strings and other extension arrays are never modified in place by the app
+            columns[name] = column.array
+    frozen = pd.DataFrame(columns, index=data.index, copy=False)
+    frozen.attrs.update(data.attrs)
+    return frozen
+
+
+def session_view(data):
+    """Zero-copy per-session view of the shared frame (writes copy instead of mutating it)"""
+    view = data.copy(deep=False)
+    view.attrs = dict(data.attrs)
+    return view
@@ -0,0 +1,156 @@
+"""
+Pre-rendered default view: the figures and panel numbers of the filters a
+new session starts with, computed once per dataset version and written to
+.cache/snapshots as JSON. A session whose filters are untouched draws the
+page from it without loading the data or building a figure; live
+computation starts when a widget changes. Switched off with SPOTIFY_SNAPSHOT=0.
+
+Usage: python -m spotify_trends.snapshot [--csv top10_s.csv]
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from spotify_trends.analysis import (correlation_drift, correlation_summary, data_overview,
+                                     feature_correlations)
+from spotify_trends.figures import (SCATTER_MODES, build_correlation_heatmap_figure,
+                                    build_danceability_energy_figure, build_duration_figure,
+                                    build_genre_year_figure, build_popularity_figure,
+                                    build_trend_figure)
+
+SNAPSHOT_DIR = Path(__file__).resolve().parent.parent / ".cache" / "snapshots"
+SNAPSHOT_ENV = "SPOTIFY_SNAPSHOT"
+# Bumped when the page or the snapshot layout changes, so older files are ignored
+SNAPSHOT_FORMAT = 1
+
+# Scatter rendering mode of the first option in the picker
+DEFAULT_SCATTER_MODE = next(iter(SCATTER_MODES.values()))
+
+
+def snapshots_enabled():
+    """True unless the default-view snapshot is switched off"""
+    return os.environ.get(SNAPSHOT_ENV, "1").lower() not in ("0", "false", "no")
+
+
+def snapshot_path(dataset_version, snapshot_dir=SNAPSHOT_DIR):
+    """File holding the default view of a dataset version"""
+    return Path(snapshot_dir) / f"default-{dataset_version}.json"
+
+
+def default_filters(year_bounds, all_genres):
+    """(year range, genres) a new session starts with: every year, the first three genres"""
+    return tuple(year_bounds), list(all_genres[:3] if len(all_genres) >= 3 else all_genres)
+
+
+def chart_builds(filtered, backend, moments, correlations, year_range, genres,
+                 scatter_mode=DEFAULT_SCATTER_MODE):
+    """Builder of every chart on the page, by chart id, for one filter state"""
+    return {
+        'scatter': lambda: build_danceability_energy_figure(filtered, moments, scatter_mode),
+        'trend': lambda: build_trend_figure(
+            backend.yearly_mean(['danceability', 'energy'], year_range, genres)),
+        'genre_year': lambda: build_genre_year_figure(
+            backend.genre_year_counts(year_range, genres), year_range),
+        # Box and violin plots built from per-genre summaries
+        'duration_box': lambda: build_duration_figure(filtered),
+        'popularity_violin': lambda: build_popularity_figure(filtered),
+        'correlation_heatmap': lambda: build_correlation_heatmap_figure(correlations),
+    }
+
+
+def top_genres(backend, year_range, genres, n=3):
+    """[(genre, songs)] of the n largest selected genres"""
+    return [(genre, int(count))
+            for genre, count in backend.genre_counts(year_range, genres).head(n).items()]
+
+
+def build_snapshot(data, index, backend, dataset_version):
+    """Default view of a dataset as a JSON-ready dict (None if the default filters select nothing)"""
+    import plotly.io as pio
+
+    year_bounds = (int(backend.years.min()), int(backend.years.max()))
+    all_genres = sorted(backend.genres)
+    year_range, genres = default_filters(year_bounds, all_genres)
+    filtered = data.take(index.positions(year_range, genres))
+    if len(filtered) == 0:
+        return None
+
+    moments = backend.moments(year_range, genres, ['danceability', 'energy'])
+    correlations = feature_correlations(backend, year_range, genres)
+    builds = chart_builds(filtered, backend, moments, correlations, year_range, genres)
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'dataset_version': dataset_version,
+        'year_bounds': year_bounds,
+        'all_genres': all_genres,
+        'genres': genres,
+        'rows': len(filtered),
+        'overview': data_overview(filtered, year_range, genres,
+                                  total=backend.count(year_range, genres)),
+        'correlation': correlation_summary(moments),
+        'genre_top': top_genres(backend, year_range, genres),
+        'drift': correlation_drift(correlations),
+        'figures': {chart_id: pio.to_json(build(), validate=False)
+                    for chart_id, build in builds.items()},
+    }
+
+
+def _plain(value):
+    # numpy scalars in the panel numbers
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def write_snapshot(snapshot, snapshot_dir=SNAPSHOT_DIR):
+    """Write a snapshot atomically and drop the ones of other dataset versions"""
+    path = snapshot_path(snapshot['dataset_version'], snapshot_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(snapshot, default=_plain), encoding='utf-8')
+    os.replace(tmp_path, path)
+    for old in path.parent.glob("default-*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def read_snapshot(dataset_version, snapshot_dir=SNAPSHOT_DIR):
+    """The snapshot of a dataset version, or None if there is no current one"""
+    path = snapshot_path(dataset_version, snapshot_dir)
+    try:
+        snapshot = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if (snapshot.get('format') != SNAPSHOT_FORMAT
+            or snapshot.get('dataset_version') != dataset_version):
+        return None
+    snapshot['year_bounds'] = tuple(snapshot['year_bounds'])
+    return snapshot
+
+
+if __name__ == '__main__':
+    from spotify_trends.cube import AggregateCube
+    from spotify_trends.index import YearGenreIndex
+    from spotify_trends.reload import dataset_version
+    from spotify_trends.store import load_dataset
+
+    parser = argparse.ArgumentParser(description="Pre-render the default view of the dataset")
+    parser.add_argument('--csv', default='top10_s.csv')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    version = dataset_version(args.csv)
+    data = load_dataset(args.csv)
+    snapshot = build_snapshot(data, YearGenreIndex(data),
+                              AggregateCube.from_frame(data, version=version), version)
+    if snapshot is None:
+        print("⚠️ The default filters select no songs, no snapshot written")
+    else:
+        path = write_snapshot(snapshot)
+        print(f"📸 Default view of {version} written to {path} "
+              f"({path.stat().st_size / 1024:.0f} KB, {time.perf_counter() - start:.1f} s)")
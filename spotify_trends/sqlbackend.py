@@ -0,0 +1,196 @@
+"""
+Optional SQLite query backend: the prepared dataset is written once to a
+local database file with a (year, genre) index, and the sidebar filter and
+chart aggregations become parameterized SQL. It answers the same queries as
+AggregateCube (count, moments, yearly_mean, genre_year_counts, genre_counts)
+plus the filter positions, so the app can use either one. It is an
+alternative query engine, not a memory saving: the song-level views still
+read the in-memory frame.
+"""
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from spotify_trends.schema import AUDIO_FEATURES
+from spotify_trends.stats import Moments
+from spotify_trends.store import STORE_DIR
+
+SQL_TABLE = "songs"
+SQL_COLUMNS = ['year', 'genre'] + AUDIO_FEATURES + ['duration_min']
+
+
+def default_db_path(dataset_version):
+    """Database file for a dataset version"""
+    return STORE_DIR / f"songs-{dataset_version}.sqlite"
+
+
+def build_database(data, db_path):
+    """Write the dataset (row position as primary key) and its indexes to a new SQLite file"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    columns = [c for c in SQL_COLUMNS if c in data.columns]
+    frame = pd.DataFrame({
+        c: data[c].astype(object) if isinstance(data[c].dtype, pd.CategoricalDtype) else data[c]
+        for c in columns
+    })
+    frame.insert(0, 'pos', np.arange(len(frame), dtype=np.int64))
+
+    types = {'pos': 'INTEGER PRIMARY KEY', 'year': 'INTEGER', 'genre': 'TEXT'}
+    schema = ", ".join(f'"{c}" {types.get(c, "REAL")}' for c in frame.columns)
+    placeholders = ", ".join("?" * len(frame.columns))
+    with sqlite3.connect(tmp_path) as conn:
+        conn.execute(f"CREATE TABLE {SQL_TABLE} ({schema})")
+        conn.executemany(f"INSERT INTO {SQL_TABLE} VALUES ({placeholders})",
+                         frame.itertuples(index=False, name=None))
+        # Covering index for the selection filter
+        conn.execute(f"CREATE INDEX idx_year_genre ON {SQL_TABLE} (year, genre, pos)")
+        conn.execute(f"CREATE INDEX idx_genre ON {SQL_TABLE} (genre)")
+        conn.execute("ANALYZE")
+    conn.close()
+    os.replace(tmp_path, db_path)
+
+    # Drop databases of older dataset versions
+    for old in db_path.parent.glob("songs-*.sqlite"):
+        if old != db_path:
+            old.unlink(missing_ok=True)
+    return db_path
+
+
+class SqlBackend:
+    """Parameterized SQL over a read-only SQLite file (one connection per thread)"""
+
+    def __init__(self, db_path, version=None):
+        self.db_path = Path(db_path)
+        self.version = version
+        self._local = threading.local()
+        columns = [row[1] for row in self._conn().execute(f"PRAGMA table_info({SQL_TABLE})")]
+        self.features = [f for f in AUDIO_FEATURES if f in columns]
+        self.years = np.array([r[0] for r in self._conn().execute(
+            f"SELECT DISTINCT year FROM {SQL_TABLE} ORDER BY year")], dtype=np.int64)
+        self.genres = [r[0] for r in self._conn().execute(
+            f"SELECT DISTINCT genre FROM {SQL_TABLE} ORDER BY genre")]
+
+    @classmethod
+    def from_frame(cls, data, db_path=None, version=None):
+        """Open the database for a dataset, building it if it does not exist yet"""
+        version = version or data.attrs.get('dataset_version')
+        db_path = Path(db_path or default_db_path(version))
+        if not db_path.exists():
+            build_database(data, db_path)
+            print(f"🗄️ Built SQLite backend {db_path}")
+        return cls(db_path, version=version)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True,
+                                   check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _where(year_range, genres):
+        """WHERE clause and parameters of a selection"""
+        genres = list(genres)
+        clause = f"year BETWEEN ? AND ? AND genre IN ({', '.join('?' * len(genres))})"
+        return clause, [int(year_range[0]), int(year_range[1])] + genres
+
+    def _query(self, sql, params):
+        return self._conn().execute(sql, params).fetchall()
+
+    def positions(self, year_range, genres):
+        """Row positions (grouped by year, then genre in list order) matching the selection"""
+        genres = list(genres)
+        where, params = self._where(year_range, genres)
+        # Same order as YearGenreIndex.positions, so sampled charts see identical input
+        genre_rank = " ".join(f"WHEN ? THEN {i}" for i in range(len(genres)))
+        order = f"year, CASE genre {genre_rank} END, pos" if genres else "year, pos"
+        rows = self._query(f"SELECT pos FROM {SQL_TABLE} WHERE {where} ORDER BY {order}",
+                           params + genres)
+        return np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+
+    def intersect(self, positions, year_range, genres):
+        """Those of sorted row positions that match the selection, in positions() order"""
+        selected = self.positions(year_range, genres)
+        return selected[np.isin(selected, positions)]
+
+    def count(self, year_range, genres):
+        """Number of rows in the selection"""
+        where, params = self._where(year_range, genres)
+        return int(self._query(f"SELECT COUNT(*) FROM {SQL_TABLE} WHERE {where}", params)[0][0])
+
+    @staticmethod
+    def _moment_columns(features):
+        """SELECT list of count, sums and upper-triangle cross products, and the pairs"""
+        k = len(features)
+        pairs = [(i, j) for i in range(k) for j in range(i, k)]
+        select = ", ".join(["COUNT(*)"]
+                           + [f'TOTAL("{f}")' for f in features]
+                           + [f'TOTAL("{features[i]}" * "{features[j]}")' for i, j in pairs])
+        return select, pairs
+
+    @staticmethod
+    def _unpack_moments(rows, k, pairs):
+        """(counts, sums, cross) arrays from result rows of _moment_columns"""
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), 1 + k + len(pairs))
+        cross = np.zeros((len(rows), k, k))
+        for column, (i, j) in enumerate(pairs, start=1 + k):
+            cross[:, i, j] = cross[:, j, i] = values[:, column]
+        return values[:, 0].astype(np.int64), values[:, 1:1 + k], cross
+
+    def moments(self, year_range, genres, features=None):
+        """Moments of the selected rows (count, sums, cross products)"""
+        features = list(features or self.features)
+        select, pairs = self._moment_columns(features)
+        where, params = self._where(year_range, genres)
+        rows = self._query(f"SELECT {select} FROM {SQL_TABLE} WHERE {where}", params)
+        counts, sums, cross = self._unpack_moments(rows, len(features), pairs)
+        return Moments(features, n=int(counts[0]), sums=sums[0], cross=cross[0])
+
+    def yearly_moments(self, year_range, genres, features=None):
+        """Per-year (years, counts, sums, cross products) of the selection, years with rows"""
+        features = list(features or self.features)
+        select, pairs = self._moment_columns(features)
+        where, params = self._where(year_range, genres)
+        rows = self._query(f"SELECT year, {select} FROM {SQL_TABLE} WHERE {where} "
+                           "GROUP BY year ORDER BY year", params)
+        counts, sums, cross = self._unpack_moments([r[1:] for r in rows], len(features), pairs)
+        return np.array([r[0] for r in rows], dtype=np.int64), counts, sums, cross
+
+    def yearly_mean(self, features, year_range, genres):
+        """Per-year mean of features (like groupby('year')[features].mean())"""
+        where, params = self._where(year_range, genres)
+        select = ", ".join(f'AVG("{f}")' for f in features)
+        rows = self._query(f"SELECT year, {select} FROM {SQL_TABLE} WHERE {where} "
+                           "GROUP BY year ORDER BY year", params)
+        result = pd.DataFrame([r[1:] for r in rows], columns=list(features), dtype=np.float64)
+        result.insert(0, 'year', np.array([r[0] for r in rows], dtype=np.int64))
+        return result
+
+    def genre_year_counts(self, year_range, genres):
+        """Song count per (year, genre) (like groupby(['year', 'genre']).size())"""
+        where, params = self._where(year_range, genres)
+        rows = self._query(f"SELECT year, genre, COUNT(*) FROM {SQL_TABLE} WHERE {where} "
+                           "GROUP BY year, genre ORDER BY year, genre", params)
+        return pd.DataFrame({
+            'year': np.array([r[0] for r in rows], dtype=np.int64),
+            'genre': np.array([r[1] for r in rows], dtype=object),
+            'count': np.array([r[2] for r in rows], dtype=np.int64),
+        })
+
+    def genre_counts(self, year_range, genres):
+        """Song count per genre, descending (like value_counts())"""
+        where, params = self._where(year_range, genres)
+        rows = self._query(f"SELECT genre, COUNT(*) AS n FROM {SQL_TABLE} WHERE {where} "
+                           "GROUP BY genre ORDER BY n DESC, genre", params)
+        return pd.Series([r[1] for r in rows],
+                         index=pd.Index([r[0] for r in rows], name='genre'),
+                         name='count', dtype=np.int64)
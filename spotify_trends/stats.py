@@ -0,0 +1,144 @@
+"""
+Sufficient statistics: n, the sums Σx and the cross products Σxy of a set
+of columns. Moments of disjoint row sets merge by addition, so the trend
+line and Pearson correlation of any selection are derived from merged
+per-(year, genre) cells without touching the rows.
+"""
+import math
+
+import numpy as np
+
+
+class Moments:
+    """Count, sums and cross-product matrix of a set of columns"""
+
+    def __init__(self, columns, n=0, sums=None, cross=None):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = n
+        self.sums = np.zeros(k) if sums is None else np.asarray(sums, dtype=np.float64)
+        self.cross = np.zeros((k, k)) if cross is None else np.asarray(cross, dtype=np.float64)
+
+    @classmethod
+    def from_frame(cls, data, columns):
+        """Moments of DataFrame columns"""
+        values = data[list(columns)].to_numpy(dtype=np.float64)
+        return cls(columns, n=len(values), sums=values.sum(axis=0), cross=values.T @ values)
+
+    def merge(self, other):
+        """Moments of the union of two disjoint row sets"""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge moments of different columns")
+        return Moments(self.columns, self.n + other.n,
+                       self.sums + other.sums, self.cross + other.cross)
+
+    __add__ = merge
+
+    def _index(self, column):
+        return self.columns.index(column)
+
+    def mean(self):
+        """Column means"""
+        return self.sums / self.n if self.n else np.full(len(self.columns), np.nan)
+
+    def covariance(self, ddof=1):
+        """Covariance matrix"""
+        if self.n <= ddof:
+            return np.full(self.cross.shape, np.nan)
+        centered = self.cross - np.outer(self.sums, self.sums) / self.n
+        return centered / (self.n - ddof)
+
+    def correlation(self):
+        """Pearson correlation matrix (NaN for constant columns)"""
+        return correlation_matrices([self.n], self.sums[None], self.cross[None])[0]
+
+    def linear_fit(self, x, y):
+        """Least-squares slope and intercept of y on x (like np.polyfit(x, y, 1))"""
+        i, j = self._index(x), self._index(y)
+        if self.n < 2:
+            return np.nan, np.nan
+        sxx = self.cross[i, i] - self.sums[i] ** 2 / self.n
+        sxy = self.cross[i, j] - self.sums[i] * self.sums[j] / self.n
+        if sxx <= 0:
+            return np.nan, np.nan
+        slope = sxy / sxx
+        intercept = (self.sums[j] - slope * self.sums[i]) / self.n
+        return slope, intercept
+
+    def pearson(self, x, y):
+        """Pearson r and two-sided p-value (like scipy.stats.pearsonr)"""
+        r = self.correlation()[self._index(x), self._index(y)]
+        return r, pearson_p_value(r, self.n)
+
+
+def correlation_matrices(n, sums, cross):
+    """
+    Pearson correlation matrices of a stack of moments in one vectorized pass:
+    n (m,), sums (m, k) and cross (m, k, k) give (m, k, k); NaN where n < 2
+    or a column is constant
+    """
+    n = np.asarray(n, dtype=np.float64)[:, None, None]
+    sums = np.asarray(sums, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = (np.asarray(cross, dtype=np.float64)
+               - sums[:, :, None] * sums[:, None, :] / n) / (n - 1)
+        std = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+        corr = cov / (std[:, :, None] * std[:, None, :])
+    corr[n[:, 0, 0] < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _beta_continued_fraction(a, b, x, max_iter=10_000, eps=1e-15):
+    """Continued fraction of the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((a - 1 + m2) * (a + m2)),
+                   -(a + m) * (a + b + m) * x / ((a + m2) * (a + 1 + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < eps:
+            break
+    return h
+
+
+def betainc(a, b, x):
+    """Regularized incomplete beta function I_x(a, b) (like scipy.special.betainc)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    # The continued fraction converges fast for x < (a + 1) / (a + b + 2); use symmetry otherwise
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def pearson_p_value(r, n):
+    """Two-sided p-value of a Pearson r over n samples (t-test, df = n - 2)"""
+    r = np.asarray(r, dtype=np.float64)
+    df = n - 2
+    if df <= 0:
+        return np.ones_like(r)[()]
+    # 2 * t.sf(|t|, df) with t^2 = r^2 df / (1 - r^2) equals I_{1-r^2}(df/2, 1/2)
+    x = np.clip(1 - r * r, 0, 1)
+    p = np.array([np.nan if np.isnan(v) else betainc(df / 2, 0.5, v) for v in x.ravel()])
+    return p.reshape(r.shape)[()]
+
+
+def accumulate_csv(csv_path, chunksize=1_000_000, features=None, version=None):
+    """
+    Stream a source CSV in chunks into an AggregateCube (per-cell moments),
+    so statistics can be computed over files larger than memory
+    """
+    from spotify_trends.streaming import stream_csv
+
+    return stream_csv(csv_path, chunksize, sample_rows=0, features=features, version=version)[1]
@@ -0,0 +1,248 @@
+"""
+Columnar data store: the source CSV is converted once into a typed Arrow
+(Feather) file which is memory-mapped on later loads instead of re-parsing
+the CSV text. The file records the source hash and is rebuilt when the CSV
+changes.
+
+Usage: python -m spotify_trends.store [top10_s.csv]
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from spotify_trends.schema import apply_schema, memory_report, validate_ranges
+
+# Default location of converted data files
+STORE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "data"
+
+# Bump when the stored layout/types change so old files get rebuilt
+STORE_FORMAT_VERSION = 2
+METADATA_KEY = b'spotify_trends'
+
+# Column mapping - map abbreviated CSV columns to full column names
+COLUMN_MAPPING = {
+    'dur': 'duration_ms',
+    'dnce': 'danceability',
+    'nrgy': 'energy',
+    'pop': 'popularity',
+    'top genre': 'genre',
+    'val': 'valence',
+    'acous': 'acousticness',
+    'spch': 'speechiness',
+    'live': 'liveness',
+    'dB': 'loudness'
+}
+
+REQUIRED_COLUMNS = ['year', 'title', 'artist', 'genre',
+                    'danceability', 'energy', 'duration_ms', 'popularity']
+
+# Last hash computed per source file, with the size/mtime it was taken at
+_hash_lock = threading.Lock()
+_known_hashes = {}
+
+
+class MissingColumnsError(ValueError):
+    """Raised when the source data lacks required columns"""
+
+    def __init__(self, missing, available):
+        super().__init__(f"Data file missing the following columns: {missing}")
+        self.missing = missing
+        self.available = available
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(csv_path, store_path=None):
+    """
+    SHA-256 of a source CSV without reading it when possible: the hash recorded
+    in the converted file or the last one computed here, if the size and mtime
+    still match; otherwise the file is hashed once and the result remembered
+    """
+    info = _source_info(csv_path)
+    key = os.path.abspath(csv_path)
+    with _hash_lock:
+        known = _known_hashes.get(key)
+    if known is not None and known[0] == info:
+        return known[1]
+
+    try:
+        metadata = read_store_metadata(store_path or default_store_path(csv_path))
+    except ImportError:
+        metadata = None
+    if (metadata and info['size'] == metadata.get('size')
+            and info['mtime_ns'] == metadata.get('mtime_ns')):
+        digest = metadata['source_sha256']
+    else:
+        digest = file_hash(csv_path)
+        if _source_info(csv_path) != info:
+            # Changed while it was read: do not remember it under either size/mtime
+            return digest
+    with _hash_lock:
+        _known_hashes[key] = (info, digest)
+    return digest
+
+
+def default_store_path(csv_path):
+    """Path of the converted file for a source CSV"""
+    return STORE_DIR / f"{Path(csv_path).stem}.feather"
+
+
+def prepare_frame(data):
+    """Apply column mapping, derived columns and cleaning to raw CSV data"""
+    # Rename columns
+    data = data.rename(columns=COLUMN_MAPPING)
+
+    # Check if required columns exist
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in data.columns]
+    if missing_columns:
+        raise MissingColumnsError(missing_columns, data.columns.tolist())
+
+    # Data preprocessing
+    data['duration_min'] = data['duration_ms'] / 60000
+    data['year'] = data['year'].astype(int)
+
+    # Data cleaning
+    data = data.dropna(subset=REQUIRED_COLUMNS)
+    return data
+
+
+def read_csv_frame(csv_path):
+    """Parse the source CSV and return the prepared, typed DataFrame"""
+    data = pd.read_csv(csv_path)
+
+    # Print original columns for debugging
+    print("Original columns:", data.columns.tolist())
+
+    data = prepare_frame(data)
+    compact = apply_schema(data)
+    print(memory_report(data, compact))
+
+    violations = validate_ranges(compact)
+    if violations:
+        print(f"⚠️ Values out of expected range: {violations}")
+    return compact
+
+
+def _source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_store_metadata(store_path):
+    """Return the metadata dict recorded in a converted file, or None"""
+    import pyarrow as pa
+
+    try:
+        with pa.memory_map(str(store_path)) as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    raw = (schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def read_store(store_path):
+    """Memory-map a converted file and return it as a DataFrame"""
+    import pyarrow as pa
+
+    with pa.memory_map(str(store_path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def write_store(data, store_path, source_hash, source_info):
+    """Write a prepared DataFrame to an uncompressed (mmap-able) Arrow file"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({
+        'format_version': STORE_FORMAT_VERSION,
+        'source_sha256': source_hash,
+        **source_info,
+    }).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+
+    store_path = Path(store_path)
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = store_path.with_suffix(store_path.suffix + '.tmp')
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, store_path)
+
+
+def store_is_fresh(metadata, csv_path, csv_hash=None):
+    """Check whether a converted file still matches its source CSV (csv_hash: if already known)"""
+    if not metadata or metadata.get('format_version') != STORE_FORMAT_VERSION:
+        return False
+    info = _source_info(csv_path)
+    if info['size'] == metadata.get('size') and info['mtime_ns'] == metadata.get('mtime_ns'):
+        return True
+    # Touched but possibly unchanged: compare content hashes
+    return (csv_hash or source_hash(csv_path)) == metadata.get('source_sha256')
+
+
+def convert_csv(csv_path, store_path=None, csv_hash=None):
+    """Convert the source CSV to the columnar store, return the DataFrame"""
+    store_path = store_path or default_store_path(csv_path)
+    info = _source_info(csv_path)
+    csv_hash = csv_hash or file_hash(csv_path)
+    data = read_csv_frame(csv_path)
+    write_store(data, store_path, csv_hash, info)
+    print(f"💾 Converted {csv_path} -> {store_path}")
+    return data
+
+
+def load_dataset(csv_path, store_path=None, csv_hash=None):
+    """
+    Load the prepared dataset, memory-mapping the converted file when it is
+    up to date. Falls back to the CSV (and rebuilds the store) otherwise.
+    The source hash is recorded in data.attrs['dataset_version']; the file
+    is hashed at most once (not at all if csv_hash is given or already known).
+    """
+    store_path = Path(store_path or default_store_path(csv_path))
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(csv_path)
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return _with_version(read_csv_frame(csv_path), csv_hash or source_hash(csv_path))
+
+    metadata = read_store_metadata(store_path) if store_path.exists() else None
+    if store_is_fresh(metadata, csv_path, csv_hash):
+        return _with_version(read_store(store_path), metadata['source_sha256'])
+
+    csv_hash = csv_hash or source_hash(csv_path, store_path)
+    try:
+        data = convert_csv(csv_path, store_path, csv_hash)
+    except MissingColumnsError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Could not build columnar store, using CSV: {e}")
+        data = read_csv_frame(csv_path)
+    return _with_version(data, csv_hash)
+
+
+def _with_version(data, source_hash):
+    """Tag a DataFrame with its dataset version (short source hash)"""
+    data.attrs['dataset_version'] = source_hash[:16]
+    return data
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else 'top10_s.csv'
+    convert_csv(source)
@@ -0,0 +1,79 @@
+"""
+Out-of-core loading: the source CSV is read in chunks, each chunk is
+prepared and added to the aggregate cube, and only a bounded uniform
+sample of rows is kept for the views that draw individual songs (scatter,
+box/violin plots, raw data table). Peak memory is bounded by the chunk
+size plus the sample size, while counts and statistics cover every row.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from spotify_trends.schema import AUDIO_FEATURES, apply_schema
+
+STREAM_CHUNK_ROWS = int(os.environ.get("SPOTIFY_STREAM_CHUNK_ROWS", 250_000))
+STREAM_SAMPLE_ROWS = int(os.environ.get("SPOTIFY_SAMPLE_ROWS", 100_000))
+
+
+class ReservoirSample:
+    """Uniform sample without replacement of at most `size` rows of a stream of DataFrames"""
+
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.rows = None
+        self._keys = np.empty(0)
+        self.seen = 0
+
+    def add(self, chunk):
+        """Offer the rows of a chunk to the sample"""
+        self.seen += len(chunk)
+        if self.size <= 0 or len(chunk) == 0:
+            return
+        # Every row gets a random key; the rows with the smallest keys form the sample
+        keys = np.concatenate([self._keys, self.rng.random(len(chunk))])
+        rows = chunk if self.rows is None else pd.concat([self.rows, chunk], ignore_index=True)
+        if len(keys) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size - 1)[:self.size])
+            keys, rows = keys[keep], rows.iloc[keep].reset_index(drop=True)
+        self._keys, self.rows = keys, rows
+
+    def frame(self):
+        """The sampled rows in stream order"""
+        return self.rows if self.rows is not None else pd.DataFrame()
+
+
+def stream_csv(csv_path, chunksize=STREAM_CHUNK_ROWS, sample_rows=STREAM_SAMPLE_ROWS,
+               features=None, version=None, seed=42):
+    """
+    Read a source CSV chunk by chunk into an AggregateCube and a row sample.
+    Returns (sample DataFrame with the compact schema, cube).
+    """
+    from spotify_trends.cube import AggregateCube
+    from spotify_trends.store import prepare_frame
+
+    cube = None
+    sample = ReservoirSample(sample_rows, seed=seed)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        chunk = prepare_frame(chunk)
+        if cube is None:
+            cube = AggregateCube([f for f in (features or AUDIO_FEATURES) if f in chunk.columns],
+                                 version=version)
+        cube.append(chunk)
+        sample.add(chunk)
+    if cube is None:
+        cube = AggregateCube(features or AUDIO_FEATURES, version=version)
+
+    # Categories are only consistent once the chunks are combined
+    return apply_schema(sample.frame()), cube
+
+
+def stream_dataset(csv_path, chunksize=STREAM_CHUNK_ROWS, sample_rows=STREAM_SAMPLE_ROWS):
+    """stream_csv with the sample tagged by dataset version, like store.load_dataset"""
+    from spotify_trends.store import source_hash
+
+    version = source_hash(csv_path)[:16]
+    sample, cube = stream_csv(csv_path, chunksize, sample_rows, version=version)
+    sample.attrs['dataset_version'] = version
+    return sample, cube
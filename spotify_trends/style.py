@@ -0,0 +1,313 @@
+"""
+Page CSS (glassmorphism theme, purple gradient)
+"""
+import functools
+import os
+
+
+# Function to load local CSS file
+def load_local_css(css_path):
+    """Load local CSS file"""
+    try:
+        with open(css_path, "r", encoding="utf-8") as f:
+            css_content = f.read()
+            return css_content
+    except FileNotFoundError:
+        return ""
+    except Exception:
+        return ""
+
+
+def build_background_style(bg_url):
+    """CSS background for .stApp: image url (if any) over the gradient"""
+    # 关键修改：使用 .stApp 而不是 .main
+    if bg_url:
+        return f"""
+        background: 
+            linear-gradient(135deg, rgba(102, 126, 234, 0.2) 0%, rgba(118, 75, 162, 0.2) 100%),
+            url({bg_url}) center/cover fixed;
+        background-blend-mode: overlay;
+    """
+    return """
+        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    """
+
+
+def build_page_css(local_font_css, bg_url):
+    """Assemble the <style> block injected into the page"""
+    background_style = build_background_style(bg_url)
+
+    # Custom CSS styles - 关键修改：针对 .stApp 应用背景
+    return f"""
+    <style>
+    /* Local font CSS */
+    {local_font_css}
+
+    /* Fallback to web fonts if local not available */
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+
+    /* Global styles */
+    * {{
+        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    }}
+
+    /* Hide Streamlit default elements */
+    #MainMenu {{visibility: hidden;}}
+    footer {{visibility: hidden;}}
+    header {{visibility: hidden;}}
+
+    .stApp {{
+        {background_style}
+    }}
+
+    /* Main container styles */
+    .main {{
+        padding: 2rem 3rem;
+    }}
+
+    /* Main header styles */
+    .main-header {{
+        font-size: 96px  !important; 
+        font-weight: 700;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        text-align: center;
+        padding: 30px 0 10px 0;
+        letter-spacing: -2px;
+    }}
+
+    /* Subtitle styles */
+    .sub-title {{
+        text-align: center;
+        color: #1e293b;
+        font-size: 18px;
+        font-weight: 500;
+        margin-bottom: 40px;
+        line-height: 1.6;
+        text-shadow: 0 1px 2px rgba(255,255,255,0.8);
+    }}
+
+    /* Section header styles */
+    .section-header {{
+        font-size: 28px;
+        font-weight: 600;
+        color: #1e293b;
+        margin-top: 50px;
+        margin-bottom: 25px;
+        padding-bottom: 12px;
+        border-bottom: 3px solid #667eea;
+        display: inline-block;
+    }}
+
+    /* Insight card styles */
+    .insight-card {{
+        background: rgba(255, 255, 255, 0.95);
+        backdrop-filter: blur(10px);
+        padding: 25px;
+        border-radius: 16px;
+        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+        margin: 20px 0;
+        border-left: 4px solid #667eea;
+        transition: transform 0.2s ease, box-shadow 0.2s ease;
+    }}
+
+    .insight-card:hover {{
+        transform: translateY(-2px);
+        box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
+    }}
+
+    .insight-card h3 {{
+        color: #1e293b;
+        font-size: 20px;
+        font-weight: 600;
+        margin-bottom: 15px;
+    }}
+
+    .insight-card p {{
+        color: #475569;
+        font-size: 15px;
+        line-height: 1.7;
+        margin: 8px 0;
+    }}
+
+    /* Stat card styles */
+    .stat-card {{
+        background: rgba(255, 255, 255, 0.95);
+        backdrop-filter: blur(10px);
+        padding: 20px;
+        border-radius: 12px;
+        box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
+        text-align: center;
+        margin: 10px 0;
+    }}
+
+    .stat-value {{
+        font-size: 32px;
+        font-weight: 700;
+        color: #667eea;
+        margin: 10px 0;
+    }}
+
+    .stat-label {{
+        font-size: 14px;
+        color: #64748b;
+        font-weight: 500;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+    }}
+
+    /* Sidebar styles */
+    section[data-testid="stSidebar"] {{
+        background: rgba(255, 255, 255, 0.95);
+        backdrop-filter: blur(10px);
+        box-shadow: 2px 0 10px rgba(0, 0, 0, 0.05);
+    }}
+
+    section[data-testid="stSidebar"] .element-container {{
+        color: #1e293b;
+    }}
+
+    /* Button styles */
+    .stButton>button {{
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 12px 24px;
+        font-weight: 600;
+        font-size: 15px;
+        transition: all 0.3s ease;
+        box-shadow: 0 4px 6px -1px rgba(102, 126, 234, 0.3);
+    }}
+
+    .stButton>button:hover {{
+        transform: translateY(-2px);
+        box-shadow: 0 10px 15px -3px rgba(102, 126, 234, 0.4);
+    }}
+
+    /* Tabs styles */
+    .stTabs [data-baseweb="tab-list"] {{
+        gap: 8px;
+        background-color: rgba(255, 255, 255, 0.9);
+        border-radius: 12px;
+        padding: 8px;
+        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+    }}
+
+    .stTabs [data-baseweb="tab"] {{
+        background-color: transparent;
+        border-radius: 8px;
+        color: #64748b;
+        font-weight: 500;
+        padding: 12px 20px;
+        transition: all 0.2s ease;
+    }}
+
+    .stTabs [aria-selected="true"] {{
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+    }}
+
+    /* Metric styles */
+    [data-testid="stMetricValue"] {{
+        font-size: 28px;
+        font-weight: 700;
+        color: #667eea;
+    }}
+
+    [data-testid="stMetricLabel"] {{
+        font-size: 14px;
+        font-weight: 500;
+        color: #64748b;
+    }}
+
+    /* Dataframe styles */
+    .dataframe {{
+        border: none !important;
+        border-radius: 12px;
+        overflow: hidden;
+        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+    }}
+
+    /* Slider styles */
+    .stSlider [data-baseweb="slider"] {{
+        background-color: #e2e8f0;
+    }}
+
+    /* Divider styles */
+    hr {{
+        margin: 40px 0;
+        border: none;
+        height: 2px;
+        background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
+    }}
+
+    /* Expander styles */
+    .streamlit-expanderHeader {{
+        background-color: rgba(255, 255, 255, 0.9);
+        border-radius: 8px;
+        font-weight: 600;
+        color: #1e293b;
+    }}
+
+    /* Footer styles */
+    .footer {{
+        text-align: center;
+        color: #64748b;
+        font-size: 14px;
+        padding: 30px 0;
+        margin-top: 50px;
+        border-top: 1px solid rgba(226, 232, 240, 0.5);
+    }}
+
+    .footer a {{
+        color: #667eea;
+        text-decoration: none;
+        font-weight: 500;
+    }}
+
+    /* Responsive design */
+    @media (max-width: 768px) {{
+        .main-header {{
+            font-size: 40px;
+        }}
+
+        .section-header {{
+            font-size: 22px;
+        }}
+    }}
+
+    /* Chart container styles */
+    .plot-container {{
+        background: rgba(255, 255, 255, 0.95);
+        backdrop-filter: blur(10px);
+        padding: 20px;
+        border-radius: 12px;
+        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+        margin: 15px 0;
+    }}
+
+    /* Additional glass effect for plotly charts */
+    .js-plotly-plot {{
+        background: rgba(255, 255, 255, 0.95) !important;
+        backdrop-filter: blur(10px);
+        border-radius: 12px;
+        padding: 10px;
+    }}
+    </style>
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_page_css(font_css_path, font_mtime_ns, bg_url):
+    return build_page_css(load_local_css(font_css_path), bg_url)
+
+
+def get_page_css(font_css_path, bg_url):
+    """Page CSS with the local fonts, assembled once per font file version and background"""
+    try:
+        mtime_ns = os.stat(font_css_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _cached_page_css(font_css_path, mtime_ns, bg_url)
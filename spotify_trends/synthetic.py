@@ -0,0 +1,66 @@
+"""
+Synthetic Spotify-like datasets of arbitrary size (for benchmarks and demos)
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_spotify_frame(n_rows, seed=42, n_genres=50, n_artists=None,
+                       years=(2010, 2019), with_text=True):
+    """
+    Build a prepared (column-mapped) DataFrame with the same columns and
+    default dtypes (int64/float64/object) as a freshly parsed CSV.
+    with_text=False skips the (slow to build) title/artist string columns.
+    """
+    rng = np.random.default_rng(seed)
+    n_artists = n_artists or max(10, n_rows // 20)
+
+    genres = np.array([f'genre {i}' for i in range(n_genres)], dtype=object)
+    artist_ids = rng.integers(0, n_artists, n_rows)
+
+    # Danceability and energy are mildly correlated, as in the real data
+    danceability = rng.normal(65, 13, n_rows)
+    energy = 0.3 * danceability + rng.normal(50, 15, n_rows)
+
+    duration_ms = rng.integers(150, 400, n_rows)
+    data = pd.DataFrame({
+        'genre': pd.Series(genres[rng.zipf(1.6, n_rows) % n_genres], dtype=object),
+        'year': rng.integers(years[0], years[1] + 1, n_rows),
+        'bpm': rng.integers(60, 200, n_rows),
+        'energy': np.clip(energy, 0, 100).round().astype(np.int64),
+        'danceability': np.clip(danceability, 0, 100).round().astype(np.int64),
+        'loudness': rng.integers(-15, 0, n_rows),
+        'liveness': rng.integers(0, 80, n_rows),
+        'valence': rng.integers(0, 100, n_rows),
+        'duration_ms': duration_ms,
+        'acousticness': rng.integers(0, 100, n_rows),
+        'speechiness': rng.integers(0, 60, n_rows),
+        'popularity': rng.integers(0, 100, n_rows).astype(np.float64),
+    })
+    data['duration_min'] = data['duration_ms'] / 60000
+    if with_text:
+        data.insert(0, 'title', pd.Series([f'Song {i}' for i in range(n_rows)], dtype=object))
+        data.insert(1, 'artist', pd.Series(np.char.add('Artist ', artist_ids.astype(str)),
+                                           dtype=object))
+    return data
+
+
+def make_sample_frame():
+    """Small random sample dataset offered when the CSV file is missing"""
+    np.random.seed(42)
+    years = np.repeat(range(2010, 2020), 100)
+    genres = np.random.choice(['Pop', 'Rock', 'Hip-Hop', 'Electronic', 'R&B'], 1000)
+
+    data = pd.DataFrame({
+        'year': years,
+        'title': [f'Song_{i}' for i in range(1000)],
+        'artist': [f'Artist_{i % 100}' for i in range(1000)],
+        'genre': genres,
+        'danceability': np.random.uniform(30, 90, 1000),
+        'energy': np.random.uniform(30, 90, 1000),
+        'duration_ms': np.random.uniform(180000, 300000, 1000),
+        'popularity': np.random.uniform(50, 100, 1000)
+    })
+
+    data['duration_min'] = data['duration_ms'] / 60000
+    return data
@@ -0,0 +1,102 @@
+"""
+Paginated raw-data table: sorting uses per-column argsort orders computed
+once per dataset, search runs over title and artist, and only the rows of
+the visible page are materialized and sent to the browser.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+TABLE_COLUMNS = ['year', 'title', 'artist', 'genre',
+                 'danceability', 'energy', 'duration_min', 'popularity']
+SEARCH_COLUMNS = ['title', 'artist']
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def _sort_values(column):
+    """Values whose argsort gives the column's sort order"""
+    if isinstance(column.dtype, pd.CategoricalDtype) and column.cat.categories.is_monotonic_increasing:
+        # Categories are sorted, so codes order like the values (missing first)
+        return column.cat.codes.to_numpy()
+    return column.to_numpy()
+
+
+class SortIndex:
+    """Stable argsort of each table column over the whole dataset, built on first use"""
+
+    def __init__(self, data, columns=TABLE_COLUMNS):
+        self.data = data
+        self.columns = [c for c in columns if c in data.columns]
+        self.n_rows = len(data)
+        self._orders = {}
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def order(self, column):
+        """Row positions of the whole dataset sorted by column"""
+        with self._lock:
+            order = self._orders.get(column)
+            if order is None:
+                order = np.argsort(_sort_values(self.data[column]), kind='stable')
+                self._orders[column] = order
+            return order
+
+    def runs(self, column):
+        """Run id of every row: equal values (and missing ones) share one, ascending in sort order"""
+        order = self.order(column)
+        with self._lock:
+            runs = self._runs.get(column)
+            if runs is None:
+                values = _sort_values(self.data[column])[order]
+                missing = pd.isna(values)
+                new_run = np.ones(len(values), dtype=bool)
+                new_run[1:] = (values[1:] != values[:-1]) & ~(missing[1:] & missing[:-1])
+                runs = np.empty(len(values), dtype=np.int64)
+                runs[order] = np.cumsum(new_run)
+                self._runs[column] = runs
+            return runs
+
+    def sort(self, positions, column, descending=False):
+        """Reorder a subset of row positions by column without re-sorting (stable both ways)"""
+        order = self.order(column)
+        selected = np.zeros(self.n_rows, dtype=bool)
+        selected[positions] = True
+        ordered = order[selected[order]]
+        if descending:
+            # Reverse the runs of equal values, keeping tied rows in their ascending order
+            ordered = ordered[np.argsort(-self.runs(column)[ordered], kind='stable')]
+        return ordered
+
+
+def search_positions(data, positions, query, columns=SEARCH_COLUMNS):
+    """Row positions whose title or artist contains query (case-insensitive)"""
+    query = query.strip()
+    if not query or len(positions) == 0:
+        return positions
+
+    keep = np.zeros(len(positions), dtype=bool)
+    for col in columns:
+        values = data[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Match each distinct value once, then look up by code (-1 = missing -> False)
+            matched = values.cat.categories.str.contains(query, case=False, regex=False)
+            matched = np.append(np.asarray(matched, dtype=bool), False)
+            keep |= matched[values.cat.codes.to_numpy()[positions]]
+        else:
+            keep |= values.take(positions).str.contains(
+                query, case=False, regex=False, na=False).to_numpy(dtype=bool)
+    return positions[keep]
+
+
+def page_bounds(n_rows, page, page_size):
+    """(start, stop, n_pages) of a 1-based page, clamped to the available rows"""
+    n_pages = max(-(-n_rows // page_size), 1)
+    page = min(max(page, 1), n_pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows), n_pages
+
+
+def page_frame(data, positions, start, stop, columns=TABLE_COLUMNS):
+    """The visible page as a DataFrame (only these rows are copied)"""
+    return data.take(positions[start:stop])[[c for c in columns if c in data.columns]]
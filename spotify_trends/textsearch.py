@@ -0,0 +1,204 @@
+"""
+Inverted index for the artist/title search. Each distinct value is
+lower-cased and split into character trigrams with one sorted posting list
+of value ids per trigram; the first one and two characters of every word
+are indexed the same way for shorter queries. Rows are grouped by value,
+so a query intersects a few posting lists and maps the matching values to
+sorted row positions without scanning the row strings.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from spotify_trends.table import SEARCH_COLUMNS
+
+NGRAM = 3
+# Distinct values encoded per block while building the index
+_BLOCK = 65_536
+# Matches above this fraction of the rows are gathered with a mask instead of a sort
+_MASK_FRACTION = 1 / 64
+# Candidate values few enough to confirm directly instead of intersecting more postings
+_CONFIRM_MAX = 256
+# Posting lists covering more than this fraction of the values are not intersected:
+# they remove few candidates, and checking every value at once is cheaper
+_DENSE_FRACTION = 1 / 8
+
+
+def _distinct_values(column):
+    """(distinct values, row codes) of a column (-1 = missing)"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.categories, column.cat.codes.to_numpy()
+    codes, uniques = pd.factorize(column)
+    return uniques, codes
+
+
+def _postings(keys, ids):
+    """
+    Sorted unique keys, offsets and value ids (one entry per key and value);
+    ids must be ascending, so a stable sort by key keeps each posting list sorted
+    """
+    order = np.argsort(keys, kind='stable')
+    keys, ids = keys[order], ids[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+    keys, ids = keys[first], ids[first]
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] + 1) != 0) if len(keys) else keys[:0]
+    return keys[starts], np.append(starts, len(keys)), ids
+
+
+def _concat_slices(values, starts, stops):
+    """Vectorized concatenation of values[start:stop] slices"""
+    lengths = stops - starts
+    total = int(lengths.sum())
+    skip = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return values[np.arange(total) + skip]
+
+
+def _intersect_sorted(small, large):
+    """Intersection of two sorted unique arrays in O(len(small) log len(large))"""
+    found = np.searchsorted(large, small)
+    found[found == len(large)] = 0
+    return small[large[found] == small] if len(large) else large
+
+
+def _gram_key(text):
+    """Posting key of a 1-3 character string (21 bits per code point)"""
+    key = 0
+    for char in text:
+        key = key << 21 | ord(char)
+    return np.uint64(key)
+
+
+class _ColumnIndex:
+    """Trigram and word-prefix postings of one column's distinct values, and rows per value"""
+
+    def __init__(self, column):
+        values, codes = _distinct_values(column)
+        self.distinct = np.asarray(values, dtype=object)
+        ids = np.arange(len(self.distinct), dtype=np.int64)
+
+        gram_keys, gram_ids, prefix_keys, prefix_ids = [], [], [], []
+        for start in range(0, len(ids), _BLOCK):
+            block_ids = ids[start:start + _BLOCK]
+            block = np.char.lower(self.distinct[start:start + _BLOCK].astype(str))
+            chars = block.view(np.uint32).reshape(len(block), -1).astype(np.uint64)
+            chars = np.pad(chars, ((0, 0), (0, max(NGRAM - chars.shape[1], 0))))
+            value_ids = np.broadcast_to(block_ids[:, None], chars.shape)
+
+            # Every trigram (padding is 0, never part of the text)
+            grams = chars[:, :-2] << 42 | chars[:, 1:-1] << 21 | chars[:, 2:]
+            present = chars[:, 2:] != 0
+            gram_keys.append(grams[present])
+            gram_ids.append(value_ids[:, 2:][present])
+
+            # One and two character word prefixes
+            blank = (chars == 0) | (chars == ord(' '))
+            word_start = ~blank
+            word_start[:, 1:] &= blank[:, :-1]
+            two = word_start[:, :-1] & ~blank[:, 1:]
+            prefix_keys += [chars[word_start], (chars[:, :-1] << 21 | chars[:, 1:])[two]]
+            prefix_ids += [value_ids[word_start], value_ids[:, :-1][two]]
+
+        # Lower-cased values, to confirm candidates with one vectorized substring check
+        self.lowered = pd.Series(self.distinct).astype(str).str.lower()
+
+        empty = [np.empty(0, dtype=np.uint64)]
+        self.gram_keys, self.gram_offsets, self.gram_ids = _postings(
+            np.concatenate(gram_keys + empty), np.concatenate(gram_ids + [ids[:0]]))
+        self.prefix_keys, self.prefix_offsets, self.prefix_ids = _postings(
+            np.concatenate(prefix_keys + empty), np.concatenate(prefix_ids + [ids[:0]]))
+
+        # Rows grouped by value (missing values, code -1, sort first and are skipped)
+        row_dtype = np.int32 if len(codes) < 2 ** 31 else np.int64
+        self.codes = codes.astype(row_dtype)
+        self.row_order = np.argsort(self.codes, kind='stable').astype(row_dtype)
+        self.value_rows = np.bincount(codes[codes >= 0], minlength=len(self.distinct))
+        self.row_offsets = (np.concatenate([[0], np.cumsum(self.value_rows)])
+                            + int((codes < 0).sum()))
+
+    @staticmethod
+    def _posting(keys, offsets, ids, key):
+        i = np.searchsorted(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return ids[:0]
+        return ids[offsets[i]:offsets[i + 1]]
+
+    def values(self, query):
+        """Sorted ids of the distinct values matching query (already lower-cased)"""
+        if len(query) < NGRAM:
+            return self._posting(self.prefix_keys, self.prefix_offsets, self.prefix_ids,
+                                 _gram_key(query))
+        lists = sorted((self._posting(self.gram_keys, self.gram_offsets, self.gram_ids,
+                                      _gram_key(query[i:i + NGRAM]))
+                        for i in range(len(query) - NGRAM + 1)), key=len)
+        if len(query) == NGRAM:
+            return lists[0]
+
+        dense = len(self.distinct) * _DENSE_FRACTION
+        matched = lists[0]
+        for ids in lists[1:]:
+            # Lists are sorted by length: once one is dense, so are the rest
+            if len(matched) <= _CONFIRM_MAX or len(ids) > dense:
+                break
+            matched = _intersect_sorted(matched, ids)
+        # All trigrams present does not mean they are adjacent: confirm the candidates
+        if len(matched) > dense:
+            # Most values are candidates: check them all at once
+            return np.flatnonzero(self.lowered.str.contains(query, regex=False).to_numpy())
+        found = self.lowered.take(matched).str.contains(query, regex=False).to_numpy()
+        return matched[found]
+
+    def n_rows(self, value_ids):
+        """Number of rows holding any of the values"""
+        return int(self.value_rows[value_ids].sum())
+
+    def rows(self, value_ids):
+        """Row positions (unordered) holding any of the values"""
+        return _concat_slices(self.row_order, self.row_offsets[value_ids],
+                              self.row_offsets[value_ids + 1])
+
+    def row_mask(self, value_ids):
+        """Boolean mask of the rows holding any of the values (one gather, for large matches)"""
+        if len(value_ids) == len(self.distinct):
+            return self.codes >= 0
+        hit = np.zeros(len(self.distinct) + 1, dtype=bool)
+        hit[value_ids] = True
+        # Code -1 (missing) reads the extra False at the end
+        return hit[self.codes]
+
+
+class TextSearchIndex:
+    """Inverted n-gram index over the title and artist columns"""
+
+    def __init__(self, data, columns=SEARCH_COLUMNS):
+        self.n_rows = len(data)
+        self.columns = {c: _ColumnIndex(data[c]) for c in columns if c in data.columns}
+        self._lock = threading.Lock()
+        self._last = (None, None)
+
+    def search(self, query):
+        """Sorted row positions whose title or artist contains query (case-insensitive)"""
+        query = query.strip().lower()
+        if not query:
+            return np.arange(self.n_rows)
+        with self._lock:
+            if self._last[0] == query:
+                return self._last[1]
+
+        matches = [(index, index.values(query)) for index in self.columns.values()]
+        total = sum(index.n_rows(value_ids) for index, value_ids in matches)
+        if total > self.n_rows * _MASK_FRACTION:
+            hit = np.zeros(self.n_rows, dtype=bool)
+            for index, value_ids in matches:
+                if len(value_ids):
+                    hit |= index.row_mask(value_ids)
+            positions = np.flatnonzero(hit)
+        else:
+            rows = [index.rows(value_ids) for index, value_ids in matches]
+            positions = np.unique(np.concatenate(rows + [np.empty(0, dtype=np.int64)]))
+            positions = positions.astype(np.int64)
+
+        with self._lock:
+            self._last = (query, positions)
+        return positions
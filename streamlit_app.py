@@ -1,12 +1,37 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-from scipy import stats
-import base64
-from pathlib import Path
+import functools
+import os
+import threading
+
+from spotify_trends.analysis import (correlation_drift, correlation_summary, data_overview,
+                                     feature_correlations)
+from spotify_trends.assets import asset_cache, get_background_url, style_payload_sizes
+from spotify_trends.cube import AggregateCube
+from spotify_trends.export import EXPORT_FORMATS, available_formats, export_cache
+from spotify_trends.figcache import FigureCache, figure_cache, figure_from_json
+from spotify_trends.figures import (SCATTER_MAX_POINTS, SCATTER_MODE_LABELS, SCATTER_MODES,
+                                     build_danceability_energy_figure)
+from spotify_trends.index import YearGenreIndex
+from spotify_trends.neighbors import (SongIndex, same_song_positions, similar_songs_frame,
+                                      song_label)
+from spotify_trends.parallel import (CHART_WORKERS, iter_chart_specs, make_chart_pool,
+                                      parallel_charts_enabled)
+from spotify_trends.profiling import (RerunProfiler, memory_tracking_requested,
+                                      profiling_requested)
+from spotify_trends.reload import DatasetWatcher, StaleVersionError, check_version, release_later
+from spotify_trends.shared import freeze_frame, session_view
+from spotify_trends.snapshot import (DEFAULT_SCATTER_MODE, build_snapshot, chart_builds,
+                                     default_filters, read_snapshot, snapshots_enabled,
+                                     top_genres, write_snapshot)
+from spotify_trends.sqlbackend import SqlBackend
+from spotify_trends.store import MissingColumnsError, load_dataset
+from spotify_trends.style import get_page_css
+from spotify_trends.streaming import stream_dataset
+from spotify_trends.synthetic import make_sample_frame
+from spotify_trends.textsearch import TextSearchIndex
+from spotify_trends.table import (PAGE_SIZES, TABLE_COLUMNS, SortIndex, page_bounds, page_frame,
+                                   search_positions)
 
 # Page configuration
 st.set_page_config(
@@ -17,410 +42,98 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-
-# Function to convert local image to base64 with compression
-def get_base64_image(image_path):
-    """Convert local image to base64 string for CSS usage"""
-    try:
-        from PIL import Image
-        import io
-
-        # Open and compress the image
-        img = Image.open(image_path)
-
-        # Convert RGBA to RGB if necessary
-        if img.mode == 'RGBA':
-            img = img.convert('RGB')
-
-        # Resize if too large (max width 1920px)
-        max_width = 1920
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_size = (max_width, int(img.height * ratio))
-            img = img.resize(new_size, Image.LANCZOS)
-            print(f"🔧 Resized image to {new_size}")
-
-        # Save to bytes with compression
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format='JPEG', quality=85, optimize=True)
-        img_byte_arr = img_byte_arr.getvalue()
-
-        encoded = base64.b64encode(img_byte_arr).decode()
-        size_kb = len(encoded) / 1024
-        return encoded
-    except ImportError:
-        print("⚠️ PIL not found, trying without compression...")
-        try:
-            with open(image_path, "rb") as img_file:
-                encoded = base64.b64encode(img_file.read()).decode()
-                return encoded
-        except Exception as e:
-            print(f"❌ Error loading image: {e}")
-            return None
-    except FileNotFoundError:
-        print(f"❌ Background image not found: {image_path}")
-        return None
-    except Exception as e:
-        print(f"❌ Error loading image: {e}")
-        return None
+# Hot-path profiler (enable with SPOTIFY_PROFILE=1 or ?profile=1; memory per stage
+# only with SPOTIFY_PROFILE, since tracing allocations slows down every session)
+profiler = RerunProfiler(enabled=profiling_requested(st.query_params),
+                         track_memory=memory_tracking_requested())
 
 
-# Function to load local CSS file
-def load_local_css(css_path):
-    """Load local CSS file"""
-    try:
-        with open(css_path, "r", encoding="utf-8") as f:
-            css_content = f.read()
-            return css_content
-    except FileNotFoundError:
-        return ""
-    except Exception as e:
-        return ""
+# Background image encoding (JPEG or WEBP)
+BACKGROUND_FORMAT = "JPEG"
+BACKGROUND_MAX_WIDTH = 1920
 
+# Background delivery: "static" serves the image by URL from ./static,
+# "inline" embeds it as a base64 data URI in the CSS on every rerun
+BACKGROUND_MODE = os.environ.get("SPOTIFY_BG_MODE", "static")
 
 possible_image_names = ["img.png", "img.jpg"]
 bg_image = None
-
-for img_name in possible_image_names:
-    bg_image = get_base64_image(img_name)
-    if bg_image:
-        break
-
-# Load local font CSS (optional, fallback to system fonts if not found)
-local_font_css = load_local_css("fonts.googleapis.com.css")
-
-# Build CSS with conditional background - 关键修改：使用 .stApp 而不是 .main
-if bg_image:
-    background_style = f"""
-        background: 
-            linear-gradient(135deg, rgba(102, 126, 234, 0.2) 0%, rgba(118, 75, 162, 0.2) 100%),
-            url(data:image/jpeg;base64,{bg_image}) center/cover fixed;
-        background-blend-mode: overlay;
-    """
-else:
-    background_style = """
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-    """
+bg_image_name = None
+
+with profiler.stage("background image"):
+    for img_name in possible_image_names:
+        bg_image = get_background_url(img_name, mode=BACKGROUND_MODE,
+                                      static_enabled=st.get_option("server.enableStaticServing"),
+                                      max_width=BACKGROUND_MAX_WIDTH, fmt=BACKGROUND_FORMAT)
+        if bg_image:
+            bg_image_name = img_name
+            break
+
+if not bg_image:
     print(" Using gradient background (fallback)")
 
-# Custom CSS styles - 关键修改：针对 .stApp 应用背景
-st.markdown(f"""
-    <style>
-    /* Local font CSS */
-    {local_font_css}
-
-    /* Fallback to web fonts if local not available */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-
-    /* Global styles */
-    * {{
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-    }}
-
-    /* Hide Streamlit default elements */
-    #MainMenu {{visibility: hidden;}}
-    footer {{visibility: hidden;}}
-    header {{visibility: hidden;}}
-
-    .stApp {{
-        {background_style}
-    }}
-
-    /* Main container styles */
-    .main {{
-        padding: 2rem 3rem;
-    }}
-
-    /* Main header styles */
-    .main-header {{
-        font-size: 96px  !important; 
-        font-weight: 700;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        padding: 30px 0 10px 0;
-        letter-spacing: -2px;
-    }}
-
-    /* Subtitle styles */
-    .sub-title {{
-        text-align: center;
-        color: #1e293b;
-        font-size: 18px;
-        font-weight: 500;
-        margin-bottom: 40px;
-        line-height: 1.6;
-        text-shadow: 0 1px 2px rgba(255,255,255,0.8);
-    }}
-
-    /* Section header styles */
-    .section-header {{
-        font-size: 28px;
-        font-weight: 600;
-        color: #1e293b;
-        margin-top: 50px;
-        margin-bottom: 25px;
-        padding-bottom: 12px;
-        border-bottom: 3px solid #667eea;
-        display: inline-block;
-    }}
-
-    /* Insight card styles */
-    .insight-card {{
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        padding: 25px;
-        border-radius: 16px;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-        margin: 20px 0;
-        border-left: 4px solid #667eea;
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-    }}
-
-    .insight-card:hover {{
-        transform: translateY(-2px);
-        box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
-    }}
-
-    .insight-card h3 {{
-        color: #1e293b;
-        font-size: 20px;
-        font-weight: 600;
-        margin-bottom: 15px;
-    }}
-
-    .insight-card p {{
-        color: #475569;
-        font-size: 15px;
-        line-height: 1.7;
-        margin: 8px 0;
-    }}
-
-    /* Stat card styles */
-    .stat-card {{
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        padding: 20px;
-        border-radius: 12px;
-        box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
-        text-align: center;
-        margin: 10px 0;
-    }}
-
-    .stat-value {{
-        font-size: 32px;
-        font-weight: 700;
-        color: #667eea;
-        margin: 10px 0;
-    }}
-
-    .stat-label {{
-        font-size: 14px;
-        color: #64748b;
-        font-weight: 500;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }}
-
-    /* Sidebar styles */
-    section[data-testid="stSidebar"] {{
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        box-shadow: 2px 0 10px rgba(0, 0, 0, 0.05);
-    }}
-
-    section[data-testid="stSidebar"] .element-container {{
-        color: #1e293b;
-    }}
-
-    /* Button styles */
-    .stButton>button {{
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 12px 24px;
-        font-weight: 600;
-        font-size: 15px;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 6px -1px rgba(102, 126, 234, 0.3);
-    }}
-
-    .stButton>button:hover {{
-        transform: translateY(-2px);
-        box-shadow: 0 10px 15px -3px rgba(102, 126, 234, 0.4);
-    }}
-
-    /* Tabs styles */
-    .stTabs [data-baseweb="tab-list"] {{
-        gap: 8px;
-        background-color: rgba(255, 255, 255, 0.9);
-        border-radius: 12px;
-        padding: 8px;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-    }}
-
-    .stTabs [data-baseweb="tab"] {{
-        background-color: transparent;
-        border-radius: 8px;
-        color: #64748b;
-        font-weight: 500;
-        padding: 12px 20px;
-        transition: all 0.2s ease;
-    }}
-
-    .stTabs [aria-selected="true"] {{
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-    }}
-
-    /* Metric styles */
-    [data-testid="stMetricValue"] {{
-        font-size: 28px;
-        font-weight: 700;
-        color: #667eea;
-    }}
-
-    [data-testid="stMetricLabel"] {{
-        font-size: 14px;
-        font-weight: 500;
-        color: #64748b;
-    }}
-
-    /* Dataframe styles */
-    .dataframe {{
-        border: none !important;
-        border-radius: 12px;
-        overflow: hidden;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-    }}
-
-    /* Slider styles */
-    .stSlider [data-baseweb="slider"] {{
-        background-color: #e2e8f0;
-    }}
-
-    /* Divider styles */
-    hr {{
-        margin: 40px 0;
-        border: none;
-        height: 2px;
-        background: linear-gradient(90deg, transparent, #e2e8f0, transparent);
-    }}
-
-    /* Expander styles */
-    .streamlit-expanderHeader {{
-        background-color: rgba(255, 255, 255, 0.9);
-        border-radius: 8px;
-        font-weight: 600;
-        color: #1e293b;
-    }}
-
-    /* Footer styles */
-    .footer {{
-        text-align: center;
-        color: #64748b;
-        font-size: 14px;
-        padding: 30px 0;
-        margin-top: 50px;
-        border-top: 1px solid rgba(226, 232, 240, 0.5);
-    }}
-
-    .footer a {{
-        color: #667eea;
-        text-decoration: none;
-        font-weight: 500;
-    }}
-
-    /* Responsive design */
-    @media (max-width: 768px) {{
-        .main-header {{
-            font-size: 40px;
-        }}
-
-        .section-header {{
-            font-size: 22px;
-        }}
-    }}
-
-    /* Chart container styles */
-    .plot-container {{
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        padding: 20px;
-        border-radius: 12px;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        margin: 15px 0;
-    }}
-
-    /* Additional glass effect for plotly charts */
-    .js-plotly-plot {{
-        background: rgba(255, 255, 255, 0.95) !important;
-        backdrop-filter: blur(10px);
-        border-radius: 12px;
-        padding: 10px;
-    }}
-    </style>
-""", unsafe_allow_html=True)
+with profiler.stage("css build"):
+    # Custom CSS styles with the local font CSS (optional, fallback to system fonts
+    # if not found), assembled once per process and reused on every rerun
+    page_css = get_page_css("fonts.googleapis.com.css", bg_image)
+    st.markdown(page_css, unsafe_allow_html=True)
 
+# Report the style payload sent per rerun (once per session)
+if bg_image_name and "bg_payload_reported" not in st.session_state:
+    st.session_state.bg_payload_reported = True
+    inline_bytes, sent_bytes = style_payload_sizes(page_css, bg_image, bg_image_name,
+                                                   max_width=BACKGROUND_MAX_WIDTH,
+                                                   fmt=BACKGROUND_FORMAT)
+    print(f"📦 Style payload per rerun: {inline_bytes / 1024:.1f} KB inline -> "
+          f"{sent_bytes / 1024:.1f} KB sent ({'inline' if bg_image.startswith('data:') else 'static'})")
 
-# Data loading function
-@st.cache_data
-def load_data():
+
+# Out-of-core mode (SPOTIFY_LOAD_MODE=stream): one chunked pass over the CSV builds
+# the aggregate cube from every row and keeps a bounded row sample for the song-level views
+STREAM_MODE = os.environ.get("SPOTIFY_LOAD_MODE", "memory").lower() == "stream"
+
+
+@st.cache_resource
+def load_streamed_dataset(dataset_version):
+    """Stream the CSV into (row sample, aggregate cube), once per dataset version"""
+    return stream_dataset('top10_s.csv')
+
+
+# Data loading function (one read-only copy per dataset version, shared by all sessions)
+@st.cache_resource
+def load_data(dataset_version):
     """
     Load and preprocess Spotify data
     Note: Replace the CSV file path with your actual path
+    The CSV is converted once to a typed columnar file (see spotify_trends.store)
     """
     try:
-        # Read CSV file
-        data = pd.read_csv('top10_s.csv')
-
-        # Print original columns for debugging
-        print("Original columns:", data.columns.tolist())
-
-        # Column mapping - map abbreviated CSV columns to full column names
-        column_mapping = {
-            'dur': 'duration_ms',
-            'dnce': 'danceability',
-            'nrgy': 'energy',
-            'pop': 'popularity',
-            'top genre': 'genre',
-            'val': 'valence',
-            'acous': 'acousticness',
-            'spch': 'speechiness',
-            'live': 'liveness',
-            'dB': 'loudness'
-        }
-
-        # Rename columns
-        data = data.rename(columns=column_mapping)
-
-        # Check if required columns exist
-        required_columns = ['year', 'title', 'artist', 'genre',
-                            'danceability', 'energy', 'duration_ms', 'popularity']
-        missing_columns = [col for col in required_columns if col not in data.columns]
-
-        if missing_columns:
-            st.error(f"Data file missing the following columns: {missing_columns}")
-            st.info("Available columns: " + ", ".join(data.columns.tolist()))
-            st.stop()
-
-        # Data preprocessing
-        data['duration_min'] = data['duration_ms'] / 60000
-        data['year'] = data['year'].astype(int)
-
-        # Data cleaning
-        data = data.dropna(subset=required_columns)
+        if STREAM_MODE:
+            data = load_streamed_dataset(dataset_version)[0]
+        else:
+            # Memory-map the converted columnar file (rebuilt from the CSV when it changes)
+            data = load_dataset('top10_s.csv')
 
         # Data validation
         if len(data) == 0:
             st.error("Data is empty, please check the CSV file")
             st.stop()
 
+        # The file may already hold a newer version: never cache its rows under this key
+        check_version(data, dataset_version)
+
         print(f"Successfully loaded {len(data)} records")
 
-        return data
+        return freeze_frame(data)
+
+    except StaleVersionError:
+        st.info("🔄 The dataset is being updated; reload the page in a moment")
+        st.stop()
+
+    except MissingColumnsError as e:
+        st.error(f"Data file missing the following columns: {e.missing}")
+        st.info("Available columns: " + ", ".join(e.available))
+        st.stop()
 
     except FileNotFoundError:
         st.error("File 'top10_s.csv' not found")
@@ -429,23 +142,7 @@ def load_data():
         # Provide sample data as fallback
         with st.expander("Continue with sample data"):
             if st.button("Generate sample data"):
-                np.random.seed(42)
-                years = np.repeat(range(2010, 2020), 100)
-                genres = np.random.choice(['Pop', 'Rock', 'Hip-Hop', 'Electronic', 'R&B'], 1000)
-
-                data = pd.DataFrame({
-                    'year': years,
-                    'title': [f'Song_{i}' for i in range(1000)],
-                    'artist': [f'Artist_{i % 100}' for i in range(1000)],
-                    'genre': genres,
-                    'danceability': np.random.uniform(30, 90, 1000),
-                    'energy': np.random.uniform(30, 90, 1000),
-                    'duration_ms': np.random.uniform(180000, 300000, 1000),
-                    'popularity': np.random.uniform(50, 100, 1000)
-                })
-
-                data['duration_min'] = data['duration_ms'] / 60000
-                return data
+                return make_sample_frame()
 
         st.stop()
 
@@ -455,8 +152,188 @@ def load_data():
         st.stop()
 
 
-# Load data
-df = load_data()
+# Year x genre index shared by all charts (built once per dataset version)
+@st.cache_resource
+def load_index(dataset_version):
+    """Build the (year, genre) row index for the loaded data"""
+    return YearGenreIndex(load_data(dataset_version))
+
+
+# Aggregate cube for the per-year and per-genre charts (built once per dataset version)
+@st.cache_resource
+def load_cube(dataset_version):
+    """Build the (year, genre) aggregate cube for the loaded data"""
+    if STREAM_MODE:
+        return load_streamed_dataset(dataset_version)[1]
+    return AggregateCube.from_frame(load_data(dataset_version), version=dataset_version)
+
+
+# Per-column sort orders for the raw data table (built once per dataset version)
+@st.cache_resource
+def load_sort_index(dataset_version):
+    """Build the column sort index for the loaded data"""
+    return SortIndex(load_data(dataset_version))
+
+
+# Artist/title inverted index for the search box (built on first use, once per dataset version)
+@st.cache_resource
+def load_search_index(dataset_version):
+    """Build the n-gram search index over the loaded data"""
+    return TextSearchIndex(load_data(dataset_version))
+
+
+# Audio feature KD-tree for "songs like this" (built on first use, once per dataset version)
+@st.cache_resource
+def load_song_index(dataset_version):
+    """Build the nearest-neighbour index over the loaded data"""
+    return SongIndex(load_data(dataset_version))
+
+
+# Aggregates of the songs matching a search within the filters (the precomputed ones
+# cover whole cells), kept for recent filter states so reruns do not rebuild them
+SEARCH_CUBE_ENTRIES = 64
+
+
+@st.cache_resource(max_entries=SEARCH_CUBE_ENTRIES)
+def load_search_cube(dataset_version, search_query, year_range, genres, _positions):
+    """Build the aggregate cube of the filtered search matches (_positions, not hashed)"""
+    return AggregateCube.from_positions(load_data(dataset_version), _positions,
+                                        version=dataset_version)
+
+
+# Worker pool for concurrent chart computation (shared by all sessions)
+@st.cache_resource
+def load_chart_pool(max_workers):
+    """Create the chart worker pool"""
+    return make_chart_pool(max_workers)
+
+
+chart_pool = load_chart_pool(CHART_WORKERS) if parallel_charts_enabled() else None
+
+# Optional SQLite query backend (SPOTIFY_BACKEND=sqlite) shared by all sessions
+# (not combined with streaming mode, where only a sample of the rows is held); the
+# song-level views still read the shared frame, so it does not lower memory
+SQL_BACKEND = (os.environ.get("SPOTIFY_BACKEND", "pandas").lower() == "sqlite"
+               and not STREAM_MODE)
+
+
+@st.cache_resource
+def load_sql_backend(dataset_version):
+    """Open (building once) the SQLite database for the loaded data"""
+    return SqlBackend.from_frame(load_data(dataset_version), version=dataset_version)
+
+
+# Pre-rendered default view (python -m spotify_trends.snapshot), not used in
+# streaming mode where the song-level charts show a sample of the rows
+SNAPSHOTS = snapshots_enabled() and not STREAM_MODE
+
+
+@st.cache_resource
+def read_cached_snapshot(dataset_version):
+    """Read the default-view snapshot of a dataset version (None if not built)"""
+    return read_snapshot(dataset_version)
+
+
+def load_snapshot(dataset_version):
+    """Default-view snapshot of a dataset version; a missing one is looked for again next run"""
+    if not SNAPSHOTS:
+        return None
+    snapshot = read_cached_snapshot(dataset_version)
+    if snapshot is None:
+        read_cached_snapshot.clear(dataset_version)
+    return snapshot
+
+
+def load_backend(dataset_version):
+    """(row index, aggregate backend) of a dataset version"""
+    if SQL_BACKEND:
+        # The database answers both the filter and the aggregations
+        backend = index = load_sql_backend(dataset_version)
+    else:
+        index = load_index(dataset_version)
+        backend = load_cube(dataset_version)
+    return index, backend
+
+
+def build_default_snapshot(dataset_version):
+    """Pre-render and write the default view of a dataset version"""
+    index, backend = load_backend(dataset_version)
+    snapshot = build_snapshot(load_data(dataset_version), index, backend, dataset_version)
+    if snapshot is not None:
+        write_snapshot(snapshot)
+        print(f"📸 Default view of {dataset_version} pre-rendered")
+
+
+def build_startup_snapshot(dataset_version):
+    """Pre-render the default view of the version current at startup (background thread)"""
+    try:
+        build_default_snapshot(dataset_version)
+    except Exception as e:
+        print(f"⚠️ Could not pre-render the default view of {dataset_version}: {e}")
+
+
+def warm_dataset_caches(dataset_version):
+    """Build the data, indexes, aggregates and default view of a new dataset version"""
+    if load_data(dataset_version) is None:
+        raise ValueError(f"dataset version {dataset_version} could not be loaded")
+    load_backend(dataset_version)
+    load_search_index(dataset_version)
+    if SNAPSHOTS:
+        build_default_snapshot(dataset_version)
+
+
+def drop_dataset_version(old_version):
+    """Drop everything cached for a replaced dataset version"""
+    figure_cache.invalidate(old_version)
+    for cached in (load_data, load_index, load_cube, load_sort_index, load_search_index,
+                   load_song_index, load_sql_backend, load_streamed_dataset, read_cached_snapshot):
+        cached.clear(old_version)
+    # Also keyed by filter state, so cleared for every version
+    load_search_cube.clear()
+    print(f"🗑️ Released dataset version {old_version}")
+
+
+def release_dataset_version(old_version, new_version):
+    """Drop a replaced version once runs still using it have had time to finish"""
+    release_later(drop_dataset_version, old_version)
+
+
+# Source file watcher: a changed CSV is loaded in the background and swapped in
+# atomically; reruns keep using the current version until the new one is ready
+@st.cache_resource
+def load_dataset_watcher():
+    """Create the process-wide dataset watcher"""
+    watcher = DatasetWatcher('top10_s.csv', warm=warm_dataset_caches,
+                             on_swap=release_dataset_version)
+    if SNAPSHOTS and watcher.version is not None and read_snapshot(watcher.version) is None:
+        # The build step was not run for the startup version: pre-render it in the background
+        threading.Thread(target=build_startup_snapshot, args=(watcher.version,),
+                         name="snapshot-build", daemon=True).start()
+    return watcher
+
+
+# Current dataset version and its pre-rendered default view
+with profiler.stage("dataset version"):
+    dataset_version = load_dataset_watcher().poll()
+    snapshot = load_snapshot(dataset_version)
+
+# Tell the user when the data changed since their last rerun
+if st.session_state.get('dataset_version') not in (None, dataset_version):
+    st.toast("🔄 The dataset was updated; charts now show the latest data")
+st.session_state.dataset_version = dataset_version
+
+
+# Load data (on first use: a page drawn from the snapshot needs it only below the charts)
+@functools.cache
+def open_dataset():
+    """(session view of the data, row index, aggregate backend) of the current version"""
+    with profiler.stage("load_data"):
+        # Zero-copy view of the shared frame; sessions keep only their filtered positions
+        df = session_view(load_data(dataset_version))
+    with profiler.stage("load index/backend"):
+        index, backend = load_backend(dataset_version)
+    return df, index, backend
+
 
 # ============ Page Title ============
 st.markdown('<p class="main-header">Spotify Music Trends Analysis</p>',
@@ -473,47 +350,315 @@ st.markdown("""
 st.sidebar.markdown("## Data Filters")
 st.sidebar.markdown("Adjust parameters to customize analysis scope")
 
-# Interactive component 1: Year slider
-year_range = st.sidebar.slider(
-    "Select Year Range",
-    min_value=int(df['year'].min()),
-    max_value=int(df['year'].max()),
-    value=(int(df['year'].min()), int(df['year'].max())),
-    step=1,
-    help="Drag the slider to select the year range for analysis"
-)
+if snapshot is None:
+    df, index, backend = open_dataset()
+    year_bounds = (int(backend.years.min()), int(backend.years.max()))
+    all_genres = sorted(backend.genres)
+else:
+    year_bounds, all_genres = snapshot['year_bounds'], snapshot['all_genres']
+
+# The filters are applied together on submit, so dragging the slider
+# triggers one recompute instead of one per intermediate position
+with st.sidebar.form("data_filters", border=False):
+    # Interactive component 1: Year slider
+    year_range = st.slider(
+        "Select Year Range",
+        min_value=year_bounds[0],
+        max_value=year_bounds[1],
+        value=year_bounds,
+        step=1,
+        help="Drag the slider to select the year range for analysis"
+    )
 
-# Interactive component 2: Genre multiselect
-all_genres = sorted(df['genre'].unique())
-selected_genres = st.sidebar.multiselect(
-    "Select Music Genres",
-    options=all_genres,
-    default=all_genres[:3] if len(all_genres) >= 3 else all_genres,
-    help="Select 1-5 genres for comparative analysis"
+    # Interactive component 2: Genre multiselect
+    selected_genres = st.multiselect(
+        "Select Music Genres",
+        options=all_genres,
+        default=default_filters(year_bounds, all_genres)[1],
+        help="Select 1-5 genres for comparative analysis"
+    )
+
+    st.form_submit_button("Apply Filters", use_container_width=True)
+
+# Interactive component 3: Artist/title search (applied on Enter)
+search_query = st.sidebar.text_input(
+    "Search Artist or Title",
+    key="song_search",
+    placeholder="e.g. Adele",
+    help="Songs whose artist or title contains the text (1-2 letters match the start of a word)"
 )
 
-# Data filtering
-filtered_df = df[
-    (df['year'] >= year_range[0]) &
-    (df['year'] <= year_range[1]) &
-    (df['genre'].isin(selected_genres))
-]
+# Untouched filters are drawn from the snapshot; live computation starts once one changes
+from_snapshot = (snapshot is not None and year_range == snapshot['year_bounds']
+                 and selected_genres == snapshot['genres'] and not search_query.strip())
+
+
+# Data filtering (slices of the precomputed year x genre index)
+@functools.cache
+def filter_rows():
+    """(filtered positions, aggregate backend) of the current filters"""
+    _, index, backend = open_dataset()
+    with profiler.stage("filter"):
+        if search_query.strip():
+            # Sorted matches from the inverted index, intersected with the year x genre cells
+            matches = load_search_index(dataset_version).search(search_query)
+            filtered_positions = index.intersect(matches, year_range, selected_genres)
+        else:
+            filtered_positions = index.positions(year_range, selected_genres)
+        if search_query.strip():
+            # The precomputed aggregates cover whole cells: summarize only the matching songs
+            backend = load_search_cube(dataset_version, search_query.strip().lower(),
+                                       tuple(year_range), tuple(selected_genres),
+                                       filtered_positions)
+    return filtered_positions, backend
+
+
+@functools.cache
+def filter_statistics():
+    """(danceability/energy moments, all-feature correlations) of the current filters"""
+    backend = filter_rows()[1]
+    with profiler.stage("statistics"):
+        moments = backend.moments(year_range, selected_genres, ['danceability', 'energy'])
+        # All-feature correlation matrices per year and for the selection
+        correlations = feature_correlations(backend, year_range, selected_genres)
+    return moments, correlations
+
+
+def scatter_inputs():
+    """(filtered rows, moments) the scatter plot is built from, rows gathered on demand"""
+    return open_dataset()[0].take(filter_rows()[0]), filter_statistics()[0]
+
 
 # Display data overview
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Data Overview")
 
+if from_snapshot:
+    overview, n_rows = snapshot['overview'], snapshot['rows']
+else:
+    df = open_dataset()[0]
+    filtered_positions, backend = filter_rows()
+    # Gathered for this run only: dropped at the end of the script (see below)
+    filtered_df = df.take(filtered_positions)
+    n_rows = len(filtered_df)
+    with profiler.stage("overview metrics"):
+        overview = data_overview(filtered_df, year_range, selected_genres,
+                                 total=backend.count(year_range, selected_genres))
+
 col1, col2 = st.sidebar.columns(2)
 with col1:
-    st.metric("Total Songs", len(filtered_df))
-    st.metric("Year Span", f"{year_range[1] - year_range[0] + 1} years")
+    st.metric("Total Songs", overview['total_songs'])
+    st.metric("Year Span", f"{overview['year_span']} years")
 with col2:
-    st.metric("Genre Count", len(selected_genres))
-    st.metric("Data Completeness",
-              f"{(1 - filtered_df.isnull().sum().sum() / (filtered_df.shape[0] * filtered_df.shape[1])) * 100:.1f}%")
+    st.metric("Genre Count", overview['genre_count'])
+    st.metric("Data Completeness", f"{overview['completeness']:.1f}%")
+
+if STREAM_MODE:
+    st.sidebar.caption(f"Streaming mode: counts and statistics cover all "
+                       f"{load_cube(dataset_version).count(year_bounds, all_genres):,} songs; "
+                       f"search results, song-level charts "
+                       f"and the table use a {len(df):,}-row sample")
+
+if n_rows == 0:
+    st.warning("No songs match the current filters"
+               + (f" and the search '{search_query.strip()}'" if search_query.strip() else "")
+               + ". Widen the year range, add genres or change the search.")
+    st.stop()
 
 # ============ Main Content Area ============
 
+# Figures are memoized per (dataset version, year range, genres, chart id)
+filter_key = (dataset_version, year_range, selected_genres, search_query)
+
+
+def figure_key(chart_id, *extra):
+    """Figure cache key for the current filter state"""
+    return FigureCache.make_key(*filter_key, chart_id, *extra)
+
+
+if from_snapshot:
+    correlation, genre_top, drift = (snapshot['correlation'], snapshot['genre_top'],
+                                     snapshot['drift'])
+    # Every figure is pre-rendered and drawn as soon as its slot is laid out
+    chart_jobs = {}
+else:
+    moments, correlations = filter_statistics()
+    correlation = correlation_summary(moments)
+    genre_top = top_genres(backend, year_range, selected_genres)
+    drift = correlation_drift(correlations)
+    # Cache key and builder of each chart; figures are rendered into their slots below
+    # (the scatter plot is drawn by its own fragment, see scatter_section)
+    chart_jobs = {chart_id: (figure_key(chart_id), build)
+                  for chart_id, build in chart_builds(filtered_df, backend, moments, correlations,
+                                                      year_range, selected_genres).items()
+                  if chart_id != 'scatter'}
+chart_slots = {}
+# Submitted right away in parallel mode, so the pool works while the page is laid out
+chart_specs = iter_chart_specs(chart_jobs, figure_cache, chart_pool)
+
+
+def chart_slot(chart_id):
+    """Reserve the place a chart is drawn in once its figure is ready"""
+    slot = st.empty()
+    if from_snapshot:
+        with profiler.stage(f"plotly_chart: {chart_id}"):
+            slot.plotly_chart(figure_from_json(snapshot['figures'][chart_id]),
+                              use_container_width=True)
+    elif chart_pool is not None:
+        slot.caption("⏳ Computing chart...")
+    chart_slots[chart_id] = slot
+
+
+# ============ Fragments ============
+# Each fragment gets its inputs as arguments; its own widgets rerun only
+# the fragment, while a full rerun (filters submitted) calls it afresh
+def require_current_version(dataset_version):
+    """
+    Rerun the whole app if a reload replaced the dataset version a fragment was
+    given at the last full run (its positions and keys belong to the old data)
+    """
+    if load_dataset_watcher().version != dataset_version:
+        st.rerun(scope="app")
+
+
+def finish_fragment(run_profiler, **extra):
+    """Log and show the timings of a fragment that reran on its own"""
+    if run_profiler is profiler or not run_profiler.enabled:
+        return
+    run_profiler.write_log(**extra)
+    st.caption(f"⏱ Fragment rerun: {len(run_profiler.records)} stages, "
+               f"{run_profiler.total_ms():.1f} ms")
+
+
+@st.fragment
+def scatter_section(scatter_inputs, n_rows, filter_key, run_profiler, snapshot_spec=None):
+    """
+    Question 1 scatter plot; changing its rendering mode reruns only this fragment
+    (scatter_inputs() returns the rows and moments, only needed to build a figure)
+    """
+    require_current_version(filter_key[0])
+    fragment_profiler = run_profiler.for_fragment("scatter")
+
+    # Interactive component 4: Scatter rendering mode
+    scatter_mode = SCATTER_MODES[st.selectbox(
+        "Scatter Rendering",
+        options=list(SCATTER_MODES),
+        key="scatter_mode",
+        help=f"Auto draws every point up to {SCATTER_MAX_POINTS:,} songs and a stratified "
+             "sample (outliers kept) above that"
+    )]
+
+    # Scatter plot (with trend line), downsampled/binned for large selections
+    with fragment_profiler.stage("figure: scatter"):
+        if snapshot_spec is not None and scatter_mode == DEFAULT_SCATTER_MODE:
+            spec = snapshot_spec
+        else:
+            spec = figure_cache.get_json(
+                FigureCache.make_key(*filter_key, 'scatter', scatter_mode),
+                lambda: build_danceability_energy_figure(*scatter_inputs(), scatter_mode))
+        fig = figure_from_json(spec)
+    with fragment_profiler.stage("plotly_chart: scatter"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    scatter_mode_used = fig.layout.meta['mode']
+    st.caption(f"Rendering mode: {SCATTER_MODE_LABELS[scatter_mode_used]} - "
+               f"{fig.layout.meta['points_drawn']:,} "
+               f"{'bins' if scatter_mode_used == 'density' else 'points'} drawn "
+               f"for {n_rows:,} songs")
+    finish_fragment(fragment_profiler, rows=n_rows)
+
+
+# Songs offered in the similar-songs picker for a search
+SONG_PICKER_LIMIT = 50
+
+
+@st.fragment
+def similar_songs_section(df, filtered_positions, dataset_version, run_profiler):
+    """Songs most similar to a picked one, among the filtered songs; reruns on its own"""
+    require_current_version(dataset_version)
+    fragment_profiler = run_profiler.for_fragment("similar songs")
+
+    query_col, k_col = st.columns([3, 1])
+    with query_col:
+        song_query = st.text_input("Find a Song (title or artist)", key="similar_query",
+                                   placeholder="e.g. Love Yourself")
+    with k_col:
+        n_similar = st.slider("Similar Songs", min_value=5, max_value=25, value=10,
+                              key="similar_k")
+
+    with fragment_profiler.stage("song search"):
+        matches = (load_search_index(dataset_version).search(song_query)[:SONG_PICKER_LIMIT]
+                   if song_query.strip() else [])
+    if len(matches) == 0:
+        st.caption("Type part of a title or artist to pick a song" if not song_query.strip()
+                   else f"No song matches '{song_query}'")
+        finish_fragment(fragment_profiler)
+        return
+
+    picked = st.selectbox("Song", matches, format_func=lambda pos: song_label(df, pos),
+                          key="similar_song")
+    with fragment_profiler.stage("similar songs"):
+        # Nearest by standardized danceability, energy, valence, acousticness,
+        # speechiness, liveness, loudness and bpm, within the current filters
+        positions, distances = load_song_index(dataset_version).query(
+            picked, n_similar, allowed=filtered_positions,
+            exclude=same_song_positions(df, picked))
+    if len(positions) == 0:
+        st.caption("No other songs match the current filters")
+    else:
+        st.dataframe(similar_songs_frame(df, positions, distances), hide_index=True,
+                     use_container_width=True)
+        st.caption(f"{len(positions)} most similar of {len(filtered_positions):,} filtered songs "
+                   "(distance over standardized audio features)")
+    finish_fragment(fragment_profiler, rows=len(filtered_positions))
+
+
+@st.fragment
+def raw_data_section(df, filtered_positions, filter_key, run_profiler):
+    """Searchable, sortable, paged raw data table and download; reruns on its own"""
+    dataset_version, year_range, _, _ = filter_key
+    require_current_version(dataset_version)
+    fragment_profiler = run_profiler.for_fragment("raw data")
+
+    # Search, sort and page server-side; only the visible page is sent
+    search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+    with search_col:
+        table_query = st.text_input("Search Title or Artist", key="table_query")
+    with sort_col:
+        table_sort = st.selectbox("Sort By", ["(filter order)"] + TABLE_COLUMNS, key="table_sort")
+    with order_col:
+        table_descending = st.selectbox("Order", ["Asc", "Desc"], key="table_order") == "Desc"
+    with size_col:
+        page_size = st.selectbox("Rows", PAGE_SIZES, key="table_page_size")
+
+    with fragment_profiler.stage("raw data table"):
+        table_rows = search_positions(df, filtered_positions, table_query)
+        if table_sort in TABLE_COLUMNS:
+            table_rows = load_sort_index(dataset_version).sort(table_rows, table_sort,
+                                                               table_descending)
+        n_pages = page_bounds(len(table_rows), 1, page_size)[2]
+        page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages,
+                               value=1, step=1, key="table_page")
+        start, stop, _ = page_bounds(len(table_rows), page, page_size)
+        st.dataframe(page_frame(df, table_rows, start, stop), use_container_width=True)
+        st.caption(f"Showing {start + 1 if stop else 0:,}-{stop:,} of {len(table_rows):,} songs")
+
+    # Download button: the file is only written (and cached) when clicked,
+    # and clicking it does not rerun anything
+    export_format = st.selectbox("Download Format", available_formats(), key="export_format")
+    export_ext, export_mime = EXPORT_FORMATS[export_format]
+    export_key = FigureCache.make_key(*filter_key, 'export')
+    st.download_button(
+        label=f"Download Filtered Data ({export_format})",
+        data=lambda: export_cache.get_path(export_key, export_format,
+                                           df.take(filtered_positions)).read_bytes(),
+        file_name=f'spotify_filtered_{year_range[0]}_{year_range[1]}.{export_ext}',
+        mime=export_mime,
+        on_click="ignore"
+    )
+    finish_fragment(fragment_profiler, rows=len(table_rows))
+
+
 # Question 1: Correlation analysis between danceability and energy
 st.markdown('<p class="section-header">Question 1: Relationship Evolution of Danceability and Energy</p>',
             unsafe_allow_html=True)
@@ -521,51 +666,13 @@ st.markdown('<p class="section-header">Question 1: Relationship Evolution of Dan
 col1, col2 = st.columns([2, 1])
 
 with col1:
-    # Chart 1: Scatter plot (with trend line)
-    fig1 = px.scatter(
-        filtered_df,
-        x='danceability',
-        y='energy',
-        color='year',
-        size='popularity',
-        hover_data=['title', 'artist', 'genre'],
-        color_continuous_scale='Viridis',
-        title='Danceability vs Energy (Bubble size represents popularity)',
-        labels={
-            'danceability': 'Danceability',
-            'energy': 'Energy',
-            'year': 'Year'
-        },
-        height=500
-    )
-
-    # Add trend line
-    z = np.polyfit(filtered_df['danceability'], filtered_df['energy'], 1)
-    p = np.poly1d(z)
-    x_trend = np.linspace(filtered_df['danceability'].min(),
-                          filtered_df['danceability'].max(), 100)
-
-    fig1.add_trace(go.Scatter(
-        x=x_trend,
-        y=p(x_trend),
-        mode='lines',
-        name='Trend Line',
-        line=dict(color='#ef4444', width=2, dash='dash')
-    ))
-
-    fig1.update_layout(
-        plot_bgcolor='white',
-        font=dict(size=12, family='Inter'),
-        showlegend=True,
-        paper_bgcolor='rgba(0,0,0,0)'
-    )
-
-    st.plotly_chart(fig1, use_container_width=True)
+    # Chart 1: Scatter plot
+    scatter_section(scatter_inputs, n_rows, filter_key, profiler,
+                    snapshot['figures']['scatter'] if from_snapshot else None)
 
 with col2:
-    # Calculate correlation coefficient
-    corr, p_value = stats.pearsonr(filtered_df['danceability'],
-                                   filtered_df['energy'])
+    # Correlation coefficient
+    corr = correlation['corr']
 
     st.markdown('<div class="insight-card">', unsafe_allow_html=True)
     st.markdown("### Key Findings")
@@ -574,7 +681,7 @@ with col2:
     with col_a:
         st.metric("Correlation", f"{corr:.3f}")
     with col_b:
-        st.metric("Significance", "Significant" if p_value < 0.05 else "Not Significant")
+        st.metric("Significance", "Significant" if correlation['significant'] else "Not Significant")
 
     st.markdown(f"""
     <p><strong>Trend Interpretation:</strong></p>
@@ -585,31 +692,7 @@ with col2:
     st.markdown('</div>', unsafe_allow_html=True)
 
     # Annual trend mini chart
-    yearly_avg = filtered_df.groupby('year')[['danceability', 'energy']].mean().reset_index()
-
-    fig_trend = go.Figure()
-    fig_trend.add_trace(go.Scatter(
-        x=yearly_avg['year'],
-        y=yearly_avg['danceability'],
-        name='Danceability',
-        line=dict(color='#667eea', width=3),
-        fill='tonexty'
-    ))
-    fig_trend.add_trace(go.Scatter(
-        x=yearly_avg['year'],
-        y=yearly_avg['energy'],
-        name='Energy',
-        line=dict(color='#764ba2', width=3)
-    ))
-    fig_trend.update_layout(
-        title='Annual Average Trend',
-        height=250,
-        margin=dict(l=20, r=20, t=40, b=20),
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Inter')
-    )
-    st.plotly_chart(fig_trend, use_container_width=True)
+    chart_slot('trend')
 
 st.markdown("---")
 
@@ -621,41 +704,19 @@ tab1, tab2 = st.tabs(["Genre Popularity Evolution", "Genre Duration & Rating Ana
 
 with tab1:
     # Chart 2: Stacked bar chart
-    genre_year = filtered_df.groupby(['year', 'genre']).size().reset_index(name='count')
-
-    fig2 = px.bar(
-        genre_year,
-        x='year',
-        y='count',
-        color='genre',
-        title='Annual Song Count Change by Genre (Stacked View)',
-        labels={'count': 'Song Count', 'year': 'Year', 'genre': 'Genre'},
-        color_discrete_sequence=px.colors.qualitative.Set3,
-        height=450
-    )
-
-    fig2.update_layout(
-        barmode='stack',
-        plot_bgcolor='white',
-        xaxis=dict(tickmode='linear', tick0=year_range[0], dtick=1),
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Inter')
-    )
-
-    st.plotly_chart(fig2, use_container_width=True)
+    chart_slot('genre_year')
 
     # Genre proportion statistics
     st.markdown("### Genre Rankings")
-    genre_stats = filtered_df['genre'].value_counts()
-    cols = st.columns(min(3, len(genre_stats)))
+    cols = st.columns(len(genre_top))
 
-    for idx, (genre, count) in enumerate(genre_stats.head(3).items()):
+    for idx, (genre, count) in enumerate(genre_top):
         with cols[idx]:
             st.markdown(f"""
             <div class="stat-card">
                 <div class="stat-label">Top {idx + 1}</div>
                 <div class="stat-value">{count}</div>
-                <div class="stat-label">{genre} ({count / len(filtered_df) * 100:.1f}%)</div>
+                <div class="stat-label">{genre} ({count / overview['total_songs'] * 100:.1f}%)</div>
             </div>
             """, unsafe_allow_html=True)
 
@@ -664,66 +725,64 @@ with tab2:
 
     with col1:
         # Chart 3: Box plot (duration distribution)
-        fig3 = px.box(
-            filtered_df,
-            x='genre',
-            y='duration_min',
-            color='genre',
-            title='Song Duration Distribution by Genre',
-            labels={'duration_min': 'Duration (minutes)', 'genre': 'Genre'},
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-            height=400
-        )
-
-        fig3.update_layout(
-            plot_bgcolor='white',
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Inter')
-        )
-
-        st.plotly_chart(fig3, use_container_width=True)
+        chart_slot('duration_box')
 
     with col2:
         # Popularity comparison (violin plot)
-        fig4 = px.violin(
-            filtered_df,
-            x='genre',
-            y='popularity',
-            color='genre',
-            title='Popularity Distribution by Genre',
-            labels={'popularity': 'Popularity Rating', 'genre': 'Genre'},
-            box=True,
-            height=400
-        )
-
-        fig4.update_layout(
-            plot_bgcolor='white',
-            showlegend=False,
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Inter')
-        )
-
-        st.plotly_chart(fig4, use_container_width=True)
+        chart_slot('popularity_violin')
+
+st.markdown("---")
+
+# Question 3: Correlations between all audio features and how they drift over the years
+st.markdown('<p class="section-header">Question 3: Audio Feature Correlations Over Time</p>',
+            unsafe_allow_html=True)
+
+col1, col2 = st.columns([3, 1])
+
+with col1:
+    # Chart 4: Animated correlation heatmap
+    chart_slot('correlation_heatmap')
+
+with col2:
+    st.markdown("### Largest Drift")
+    if drift is None:
+        st.caption("Select at least two years with songs to compare correlations over time")
+    else:
+        first_year, last_year = drift['first_year'], drift['last_year']
+        st.metric(f"{drift['pair'][0].capitalize()} vs {drift['pair'][1].capitalize()}",
+                  f"{drift['last']:.2f}", f"{drift['change']:+.2f} since {first_year}")
+        st.caption(f"Correlation went from {drift['first']:.2f} in {first_year} "
+                   f"to {drift['last']:.2f} in {last_year}. Press play to watch every "
+                   f"feature pair change year by year.")
+
+st.markdown("---")
+
+# The song-level sections need the data (loaded only from here on when the charts came
+# from the snapshot, so they are already on screen); they gather rows from the positions
+df = open_dataset()[0]
+filtered_positions = filter_rows()[0]
+
+# Songs like this: nearest neighbours by audio features within the current filters
+st.markdown('<p class="section-header">Find Similar Songs</p>', unsafe_allow_html=True)
+similar_songs_section(df, filtered_positions, dataset_version, profiler)
 
 st.markdown("---")
 
 # ============ Raw Data Display ============
 with st.expander("View Filtered Raw Data"):
-    st.dataframe(
-        filtered_df[['year', 'title', 'artist', 'genre',
-                     'danceability', 'energy', 'duration_min', 'popularity']],
-        use_container_width=True
-    )
+    raw_data_section(df, filtered_positions, filter_key, profiler)
 
-    # Download button
-    csv = filtered_df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="Download Filtered Data (CSV)",
-        data=csv,
-        file_name=f'spotify_filtered_{year_range[0]}_{year_range[1]}.csv',
-        mime='text/csv'
-    )
+# ============ Chart Rendering ============
+# Figures are built one by one, or concurrently on the worker pool
+# (SPOTIFY_PARALLEL_CHARTS=1), and drawn into their slots as they finish
+for chart_id, spec, build_ms in chart_specs:
+    profiler.record(f"figure: {chart_id}", build_ms)
+    with profiler.stage(f"plotly_chart: {chart_id}"):
+        chart_slots[chart_id].plotly_chart(figure_from_json(spec), use_container_width=True)
+
+# Fragments keep this run's globals reachable until the next full run: drop the gathered
+# rows and the chart builders holding them, so between reruns a session keeps only positions
+filtered_df = chart_jobs = chart_specs = None
 
 # Footer
 st.markdown("""
@@ -731,4 +790,18 @@ st.markdown("""
         Data Source: Spotify 2010-2019 Popular Songs Dataset | 
         Development Tools: Python + Streamlit + Plotly<br>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ============ Profiler Panel ============
+# Marks the full run as finished: fragment reruns from here on are profiled on their own
+profiler.write_log(rows=n_rows, year_range=list(year_range),
+                   genres=len(selected_genres), figure_cache=figure_cache.stats())
+if profiler.enabled:
+    with st.sidebar.expander("Rerun Profile", expanded=False):
+        st.caption(f"Full rerun: {len(profiler.records)} stages, {profiler.total_ms():.1f} ms | "
+                   f"log: {profiler.log_path.name}")
+        st.dataframe(pd.DataFrame(profiler.records).round(2), hide_index=True,
+                     use_container_width=True)
+        cache_stats = figure_cache.stats()
+        st.caption(f"Figure cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['size_mb']:.1f} MB | Image cache: {asset_cache.stats()}")
@@ -0,0 +1,25 @@
+"""
+Shared test setup: the repository root and benchmarks/ are importable, so
+the tests can reuse the benchmark checks, and `app` runs streamlit_app.py
+headless from the repository root.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """AppTest of the dashboard on the bundled dataset, with every chart computed live"""
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.chdir(ROOT)
+    # The pre-rendered default view would bypass the figure cache
+    monkeypatch.setenv("SPOTIFY_SNAPSHOT", "0")
+    return AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=120)
@@ -0,0 +1,27 @@
+"""
+SQLite backend parity (benchmarks/check_backend_parity.py as a test): the
+filter rows and chart data of both backends match on a small synthetic
+dataset and on the bundled CSV.
+"""
+import contextlib
+import io
+
+import pytest
+
+from check_backend_parity import compare
+from common import ROOT, synthetic_dataset
+
+from spotify_trends.store import load_dataset
+
+
+def test_backends_match_on_synthetic_data():
+    assert compare("synthetic", synthetic_dataset(5_000, with_text=False)) == 0
+
+
+def test_backends_match_on_bundled_dataset():
+    csv = ROOT / 'top10_s.csv'
+    if not csv.exists():
+        pytest.skip("top10_s.csv not present")
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = load_dataset(str(csv))
+    assert compare(csv.name, data) == 0
@@ -0,0 +1,32 @@
+"""
+Reruns with unchanged filters are served from the figure cache. Switching
+tabs or opening an expander never reaches the server; any rerun that does
+(a widget elsewhere, a page refresh) must not rebuild a figure either.
+"""
+from spotify_trends.figcache import figure_cache
+
+
+def test_rerun_with_unchanged_filters_builds_no_figure(app):
+    app.run()
+    assert not app.exception
+    misses, hits = figure_cache.misses, figure_cache.hits
+
+    app.run()
+    assert not app.exception
+    assert figure_cache.misses == misses
+    assert figure_cache.hits > hits
+
+
+def test_returning_to_previous_filters_builds_no_figure(app):
+    app.run()
+    default_range = app.sidebar.slider[0].value
+
+    app.sidebar.slider[0].set_value((2012, 2016))
+    app.sidebar.button[0].click().run()
+    assert not app.exception
+    misses = figure_cache.misses
+
+    app.sidebar.slider[0].set_value(default_range)
+    app.sidebar.button[0].click().run()
+    assert not app.exception
+    assert figure_cache.misses == misses
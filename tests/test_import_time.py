@@ -0,0 +1,23 @@
+"""
+Cold-start import budget (benchmarks/check_import_time.py as a test): the
+app modules import within the budget and defer plotly.express,
+plotly.graph_objects, SciPy and Pillow until a chart or image is built.
+Each import runs in a fresh interpreter; the budget applies to the best of
+several runs and can be raised with SPOTIFY_IMPORT_BUDGET_MS on slow machines.
+"""
+from check_import_time import DEFAULT_BUDGET_MS, DEFERRED_MODULES, best_of, measure
+
+# The first run also warms the OS file cache; the best one is compared with the budget
+BUDGET_RUNS = 5
+
+
+def test_app_modules_defer_heavy_imports():
+    _, cumulative = measure()
+    assert [m for m in DEFERRED_MODULES if m in cumulative] == []
+
+
+def test_app_modules_import_within_budget():
+    total_ms = best_of(BUDGET_RUNS)[0]
+    assert total_ms <= DEFAULT_BUDGET_MS, (
+        f"cold import took {total_ms:.0f} ms (budget {DEFAULT_BUDGET_MS:.0f} ms, "
+        "set SPOTIFY_IMPORT_BUDGET_MS to change it)")
@@ -0,0 +1,30 @@
+"""
+Compact dtype schema (python -m spotify_trends.schema as a test): synthetic
+data is downcast to the smallest types without changing any value, and
+out-of-range features are reported.
+"""
+import numpy as np
+import pandas as pd
+
+from spotify_trends.schema import AUDIO_FEATURES, apply_schema, validate_ranges
+from spotify_trends.synthetic import make_spotify_frame
+
+
+def test_apply_schema_compacts_without_changing_values():
+    raw = make_spotify_frame(10_000, seed=1)
+    compact = apply_schema(raw)
+
+    assert isinstance(compact['genre'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact['artist'].dtype, pd.CategoricalDtype)
+    for col in AUDIO_FEATURES:
+        assert compact[col].dtype.itemsize <= 2, col
+        np.testing.assert_array_equal(compact[col].to_numpy(dtype=np.float64),
+                                      raw[col].to_numpy(dtype=np.float64))
+    assert (compact.memory_usage(deep=True).sum()
+            < raw.memory_usage(deep=True).sum() / 2)
+
+
+def test_validate_ranges_reports_violations():
+    compact = apply_schema(make_spotify_frame(1_000, seed=2))
+    assert validate_ranges(compact) == {}
+    assert validate_ranges(compact.assign(loudness=5)) == {'loudness': len(compact)}
@@ -0,0 +1,25 @@
+"""
+Artist/title search: the aggregates of the matching songs are built once
+per filter state, so reruns with the same search do not rebuild them.
+"""
+from spotify_trends.cube import AggregateCube
+
+
+def test_rerun_with_same_search_reuses_aggregates(app, monkeypatch):
+    builds = []
+    from_positions = AggregateCube.from_positions.__func__
+
+    def counting(cls, *args, **kwargs):
+        builds.append(1)
+        return from_positions(cls, *args, **kwargs)
+
+    monkeypatch.setattr(AggregateCube, 'from_positions', classmethod(counting))
+    app.run()
+    # A query no other test uses, so the cube is not cached yet
+    app.sidebar.text_input(key="song_search").set_value("love").run()
+    assert not app.exception
+    assert len(builds) == 1
+
+    app.run()
+    assert not app.exception
+    assert len(builds) == 1
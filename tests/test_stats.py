@@ -0,0 +1,84 @@
+"""
+Moments parity: the in-house Pearson r, its p-value (in-house betainc) and
+the least-squares line match scipy.stats.pearsonr and np.polyfit, for the
+whole data and for moments merged from parts of it, and at the edges
+(fewer than three rows, a constant column, a perfect correlation).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from spotify_trends.stats import Moments
+
+
+def _frame(x, y):
+    return pd.DataFrame({'x': np.asarray(x, dtype=np.float64),
+                         'y': np.asarray(y, dtype=np.float64)})
+
+
+def _assert_matches_scipy(moments, x, y):
+    r, p = moments.pearson('x', 'y')
+    expected = stats.pearsonr(x, y)
+    assert r == pytest.approx(expected.statistic, abs=1e-12)
+    assert p == pytest.approx(expected.pvalue, rel=1e-8, abs=1e-300)
+    slope, intercept = moments.linear_fit('x', 'y')
+    np.testing.assert_allclose([slope, intercept], np.polyfit(x, y, 1), rtol=1e-9)
+
+
+@pytest.mark.parametrize('n, noise', [(3, 1.0), (20, 5.0), (500, 15.0), (20_000, 40.0)])
+def test_pearson_and_linear_fit_match_scipy_and_numpy(n, noise):
+    rng = np.random.default_rng(n)
+    x = rng.normal(65, 13, n)
+    y = 0.3 * x + rng.normal(50, noise, n)
+    _assert_matches_scipy(Moments.from_frame(_frame(x, y), ['x', 'y']), x, y)
+
+
+def test_merged_moments_match_the_whole_data():
+    rng = np.random.default_rng(7)
+    x = rng.integers(0, 100, 3_000)
+    y = x // 2 + rng.integers(0, 60, 3_000)
+    data = _frame(x, y)
+    parts = np.array_split(np.arange(len(data)), [5, 900, 901, 2_000])
+    merged = Moments(['x', 'y'])
+    for part in parts:
+        merged = merged + Moments.from_frame(data.iloc[part], ['x', 'y'])
+
+    assert merged.n == len(data)
+    _assert_matches_scipy(merged, x, y)
+
+
+def test_two_rows_have_no_significance():
+    moments = Moments.from_frame(_frame([1, 2], [3, 1]), ['x', 'y'])
+    r, p = moments.pearson('x', 'y')
+    assert r == pytest.approx(-1.0)
+    assert p == 1.0
+    np.testing.assert_allclose(moments.linear_fit('x', 'y'), np.polyfit([1, 2], [3, 1], 1))
+
+
+def test_fewer_than_two_rows_give_nan():
+    for moments in (Moments(['x', 'y']), Moments.from_frame(_frame([1], [2]), ['x', 'y'])):
+        assert np.isnan(moments.pearson('x', 'y')[0])
+        assert np.isnan(moments.linear_fit('x', 'y')).all()
+
+
+def test_constant_column_gives_nan():
+    moments = Moments.from_frame(_frame([4, 4, 4, 4], [1, 2, 3, 5]), ['x', 'y'])
+    r, p = moments.pearson('x', 'y')
+    assert np.isnan(r) and np.isnan(p)
+    assert np.isnan(moments.linear_fit('x', 'y')).all()
+    # A constant y has no correlation either, but a flat line fits it
+    flat = Moments.from_frame(_frame([1, 2, 3, 5], [4, 4, 4, 4]), ['x', 'y'])
+    assert np.isnan(flat.pearson('x', 'y')[0])
+    np.testing.assert_allclose(flat.linear_fit('x', 'y'), [0.0, 4.0], atol=1e-12)
+
+
+@pytest.mark.parametrize('sign', [1, -1])
+def test_perfect_correlation(sign):
+    x = np.arange(50, dtype=np.float64)
+    y = sign * 2.5 * x + 7
+    moments = Moments.from_frame(_frame(x, y), ['x', 'y'])
+    r, p = moments.pearson('x', 'y')
+    assert r == pytest.approx(sign, abs=1e-12)
+    assert p == pytest.approx(stats.pearsonr(x, y).pvalue, abs=1e-12)
+    np.testing.assert_allclose(moments.linear_fit('x', 'y'), [sign * 2.5, 7.0], rtol=1e-9)